@@ -124,8 +124,14 @@ test_threads = {}
 stop_flags = {}
 test_status = {}
 pause_flags = {}
+resume_events = {}  # test_type -> threading.Event, cleared while the test is paused
 hop_counts_initialized = False
 
+
+def get_resume_event(test_type):
+    """Event a paused test waits on; set on resume and stop so the test thread wakes at once"""
+    return resume_events.setdefault(test_type, threading.Event())
+
 # Test configurations
 TEST_CONFIGS = {
     'ping': {
@@ -345,6 +351,7 @@ def start_test():
     # Reset flags
     stop_flags[test_type] = False
     pause_flags[test_type] = False
+    get_resume_event(test_type).set()
     test_status[test_type] = {
         'running': True,
         'paused': False,
@@ -380,6 +387,7 @@ def stop_test():
     
     # Always set stop flag and clear status to prevent race conditions
     stop_flags[test_type] = True
+    get_resume_event(test_type).set()  # Wake a paused test so it sees the stop
     
     if test_type in test_status:
         test_status[test_type]['running'] = False
@@ -436,6 +444,7 @@ def pause_test():
         if test_type not in pause_flags:
             pause_flags[test_type] = False
             
+        get_resume_event(test_type).clear()
         pause_flags[test_type] = True
         if test_type in test_status:
             test_status[test_type]['paused'] = True
@@ -470,6 +479,7 @@ def resume_test():
     if is_test_running or thread_exists:
         # Resume by setting pause flag to False
         pause_flags[test_type] = False
+        get_resume_event(test_type).set()
         if test_type in test_status:
             test_status[test_type]['paused'] = False
         
@@ -866,7 +876,8 @@ def run_test(test_type, params, output_format='txt'):
             # Provide a pause callback that reads the pause_flags for this test
             def pause_callback():
                 return pause_flags.get(test_type, False)
-            success, fail, skipped = rssiTest.fetch_rsl_for_all(log_file, progress_callback, stop_callback, timeout, pause_callback)
+            success, fail, skipped = rssiTest.fetch_rsl_for_all(log_file, progress_callback, stop_callback, timeout, pause_callback,
+                                                                 resume_event=get_resume_event(test_type))
             total_run = success + fail
             summary = f"SUMMARY: {success}/{total_run} devices responded ({(success / total_run * 100) if total_run>0 else 0:.1f}% success rate)"
             # store summary and counts in test_status for frontend
@@ -880,7 +891,8 @@ def run_test(test_type, params, output_format='txt'):
             # Provide a pause callback that reads the pause_flags for this test
             def pause_callback():
                 return pause_flags.get(test_type, False)
-            success, fail, skipped = rplTest.fetch_rpl_for_all(log_file, progress_callback, stop_callback, timeout, pause_callback)
+            success, fail, skipped = rplTest.fetch_rpl_for_all(log_file, progress_callback, stop_callback, timeout, pause_callback,
+                                                                resume_event=get_resume_event(test_type))
             total_run = success + fail
             summary = f"SUMMARY: {success}/{total_run} devices responded ({(success / total_run * 100) if total_run>0 else 0:.1f}% success rate)"
             # store summary and counts in test_status for frontend
@@ -943,6 +955,7 @@ def run_test(test_type, params, output_format='txt'):
         # Ensure flags are cleared
         stop_flags[test_type] = False
         pause_flags[test_type] = False
+        get_resume_event(test_type).set()
         
         # Clean up thread entry
         if test_type in test_threads:
@@ -1008,6 +1021,7 @@ def force_cleanup(test_type):
     
     stop_flags[test_type] = False
     pause_flags[test_type] = False
+    get_resume_event(test_type).set()
     
     return jsonify({'success': True, 'message': f'Force cleanup completed for {test_type}'})
 
@@ -1225,21 +1239,17 @@ def download_wisun_tree(format_type):
         
         # Generate report based on format
         if format_type == 'txt':
-            content = generate_txt_report(tree_output, actual_device_count, timestamp)
-            file_data = content.encode('utf-8')
+            file_data = generate_txt_report(tree_output, actual_device_count, timestamp)
         elif format_type == 'pdf':
             file_data = generate_pdf_report(tree_output, actual_device_count, timestamp)
         elif format_type == 'word':
             file_data = generate_word_report(tree_output, actual_device_count, timestamp)
         elif format_type == 'json':
-            content = generate_json_report(tree_output, actual_device_count, timestamp)
-            file_data = content.encode('utf-8')
+            file_data = generate_json_report(tree_output, actual_device_count, timestamp)
         elif format_type == 'csv':
-            content = generate_csv_report(tree_output, actual_device_count, timestamp)
-            file_data = content.encode('utf-8')
+            file_data = generate_csv_report(tree_output, actual_device_count, timestamp)
         elif format_type == 'xml':
-            content = generate_xml_report(tree_output, actual_device_count, timestamp)
-            file_data = content.encode('utf-8')
+            file_data = generate_xml_report(tree_output, actual_device_count, timestamp)
         else:
             return jsonify({'success': False, 'error': 'Invalid format type'}), 400
         
@@ -1275,7 +1285,7 @@ def download_wisun_tree(format_type):
 def get_connected_nodes():
     """Get list of connected Wi-SUN nodes with pole numbers"""
     try:
-        from tests.ip import FAN11_FSK_IPV6, get_pole_number
+        from tests.ip import DEVICES, FAN11_FSK_IPV6
         hop_counts_data = load_hop_counts()
         
         # Extract the actual hop_counts dictionary from the loaded data
@@ -1287,13 +1297,12 @@ def get_connected_nodes():
         connected_nodes = []
         
         # Find devices that are in hop_counts.json (connected devices)
-        for device_name, device_ip in FAN11_FSK_IPV6.items():
+        for device_name, device_ip, pole_number in DEVICES:
             ip_lower = device_ip.lower()
             if ip_lower in actual_hop_counts:
                 hop_count = actual_hop_counts[ip_lower]
                 # Exclude border router (hop count 0) and unknown devices
                 if hop_count > 0:
-                    pole_number = get_pole_number(device_name)
                     connected_nodes.append({
                         'device_name': device_name,
                         'ip': device_ip,
@@ -1330,7 +1339,7 @@ def get_connected_nodes():
 def get_disconnected_nodes():
     """Get list of disconnected Wi-SUN nodes with pole numbers"""
     try:
-        from tests.ip import FAN11_FSK_IPV6, get_pole_number
+        from tests.ip import DEVICES, FAN11_FSK_IPV6
         hop_counts_data = load_hop_counts()
         
         # Extract the actual hop_counts dictionary from the loaded data
@@ -1342,10 +1351,9 @@ def get_disconnected_nodes():
         disconnected_nodes = []
         
         # Find devices that are in FAN11_FSK_IPV6 but NOT in hop_counts.json
-        for device_name, device_ip in FAN11_FSK_IPV6.items():
+        for device_name, device_ip, pole_number in DEVICES:
             ip_lower = device_ip.lower()
             if ip_lower not in actual_hop_counts:
-                pole_number = get_pole_number(device_name)
                 disconnected_nodes.append({
                     'device_name': device_name,
                     'ip': device_ip,
@@ -0,0 +1,314 @@
+#!/usr/bin/env python3
+"""
+CoAP Request Utilities
+Runs coap-client-notls requests for the CoAP based tests, several at a time
+"""
+
+import json
+import logging
+import os
+import queue
+import re
+import select
+import shutil
+import subprocess
+import threading
+import time
+from tests.hopCountUtils import should_skip_device
+
+try:
+    import orjson  # Optional, faster parsing of the JSON responses
+except ImportError:
+    orjson = None
+
+# How often a waiting window wakes up to check stop_callback
+STOP_POLL_INTERVAL_MS = 500
+
+# An integer JSON value right after a key, up to the next member or the end of the object
+_INT_VALUE_PATTERN = re.compile(rb'\s*:\s*(-?\d+)\s*[,}]')
+
+
+# Fixed part of every om2m request, only the timeout and the address vary
+COAP_COMMAND_PREFIX = (
+    "coap-client-notls",
+    "-m", "post",
+    "-N",           # Non-confirmable
+    "-t", "text",
+)
+
+
+_coap_client_path = None
+
+
+def coap_client_path():
+    """Absolute path of coap-client-notls, resolved once it is found on PATH"""
+    global _coap_client_path
+    if _coap_client_path is None:
+        _coap_client_path = shutil.which(COAP_COMMAND_PREFIX[0])
+    return _coap_client_path or COAP_COMMAND_PREFIX[0]
+
+
+def coap_command(ip, timeout):
+    """Build the coap-client-notls command for a device's om2m resource"""
+    return [coap_client_path(), *COAP_COMMAND_PREFIX[1:], "-B", str(timeout), f"coap://[{ip}]:5683/om2m"]
+
+
+def extract_int_fields(payload, keys):
+    """
+    Pull integer fields straight out of a JSON response without parsing all of it.
+    keys are quoted byte strings, e.g. (b'"rpl_rank"',). Returns a dict keyed on the
+    bare field names, or None if any field is missing or isn't a plain integer, in
+    which case the caller falls back to a full JSON parse.
+    """
+    fields = {}
+    for key in keys:
+        i = payload.find(key)
+        if i < 0:
+            return None
+        match = _INT_VALUE_PATTERN.match(payload, i + len(key))
+        if match is None:
+            return None
+        fields[key[1:-1].decode()] = int(match.group(1))
+    return fields
+
+
+def _load_json(payload):
+    return orjson.loads(payload) if orjson is not None else json.loads(payload)
+
+
+class CoapRequest:
+    """A running coap-client-notls request and the output read from it so far"""
+
+    def __init__(self, ip, timeout, tag=None, fields=None):
+        self.ip = ip
+        self.tag = tag
+        self.fields = fields
+        self.output = bytearray()
+        # -B already bounds the request, the margin only guards against a hung client
+        self.deadline = time.monotonic() + timeout + 5
+        # An absolute executable and close_fds=False let subprocess use posix_spawn
+        # instead of fork+exec. Python's own fds are non-inheritable, so nothing leaks.
+        self.proc = subprocess.Popen(coap_command(ip, timeout), stdout=subprocess.PIPE,
+                                     stderr=subprocess.DEVNULL, close_fds=False)
+
+    def fileno(self):
+        return self.proc.stdout.fileno()
+
+    def read(self):
+        """Read what is available, returns False once the client closed its output"""
+        chunk = os.read(self.fileno(), 4096)
+        self.output.extend(chunk)
+        return bool(chunk)
+
+    def exited(self):
+        """
+        True if the client has already exited, its remaining output is then read in
+        full. A sweep that was paused may find requests like this past their deadline.
+        """
+        if self.proc.poll() is None:
+            return False
+        while self.read():
+            pass
+        return True
+
+    def finish(self):
+        """
+        Reap the client and return its JSON response as a dict, or None.
+        With fields set, only those integer fields are extracted when possible.
+        """
+        self.proc.stdout.close()
+        self.proc.wait()
+        if self.proc.returncode != 0 or not self.output:
+            return None
+        if self.fields:
+            data = extract_int_fields(self.output, self.fields)
+            if data is not None:
+                return data
+        try:
+            return _load_json(self.output)
+        except ValueError:
+            return None
+
+    def cancel(self):
+        """Stop the client without waiting for a response"""
+        try:
+            self.proc.terminate()
+            try:
+                self.proc.wait(timeout=2)
+            except subprocess.TimeoutExpired:
+                self.proc.kill()
+                self.proc.wait()
+        except Exception:
+            pass
+        finally:
+            self.proc.stdout.close()
+
+
+class CoapRequestWindow:
+    """
+    Keeps several CoAP requests in flight and waits on all of their outputs at once
+    with select.poll, so a finished request is picked up as soon as it answers.
+    """
+
+    def __init__(self, stop_callback=None, fields=None):
+        """fields: names of the integer fields the caller reads, see extract_int_fields"""
+        self.stop_callback = stop_callback
+        self.fields = tuple(f'"{name}"'.encode() for name in fields) if fields else None
+        self.requests = {}  # fd -> CoapRequest
+        self.failed = []  # (tag, None) for requests whose client could not be started
+        self.poller = select.poll()
+
+    def __len__(self):
+        return len(self.requests) + len(self.failed)
+
+    def submit(self, ip, timeout, tag=None):
+        """Start a request, tag is handed back with its result"""
+        try:
+            request = CoapRequest(ip, timeout, tag, self.fields)
+        except OSError:
+            # e.g. coap-client-notls not installed, report it like any failed request
+            self.failed.append((tag, None))
+            return
+        self.requests[request.fileno()] = request
+        self.poller.register(request.fileno(), select.POLLIN)
+
+    def _remove(self, fd):
+        self.poller.unregister(fd)
+        return self.requests.pop(fd)
+
+    def poll(self):
+        """
+        Wait until at least one request finishes and return [(tag, data), ...].
+        If stop_callback fires, every request is cancelled and [] is returned.
+        """
+        finished, self.failed = self.failed, []
+        while self.requests and not finished:
+            if self.stop_callback and self.stop_callback():
+                self.close()
+                break
+
+            for fd, event in self.poller.poll(STOP_POLL_INTERVAL_MS):
+                request = self.requests[fd]
+                if event & select.POLLIN and request.read():
+                    continue
+                # EOF or hangup, the client is done
+                finished.append((request.tag, self._remove(fd).finish()))
+
+            now = time.monotonic()
+            for fd, request in list(self.requests.items()):
+                if now > request.deadline:
+                    # Nothing reads the window while the sweep is paused, so a request
+                    # past its deadline may well have answered in time
+                    if request.exited():
+                        finished.append((request.tag, self._remove(fd).finish()))
+                    else:
+                        self._remove(fd).cancel()
+                        finished.append((request.tag, None))
+
+        return finished
+
+    def close(self):
+        """Cancel every request still in flight"""
+        self.failed = []
+        for fd in list(self.requests):
+            self._remove(fd).cancel()
+
+
+class ProgressDispatcher:
+    """
+    Stands in for progress_callback and calls it from its own thread, so a slow
+    push to the frontend doesn't hold up the CoAP requests. Calls are queued in
+    order; close() waits until every queued call has been delivered.
+    """
+
+    def __init__(self, progress_callback, maxsize=256):
+        self.progress_callback = progress_callback
+        # Bounded so a stalled frontend eventually slows the sweep instead of growing memory
+        self.queue = queue.Queue(maxsize)
+        self.thread = threading.Thread(target=self._drain, daemon=True)
+        self.thread.start()
+
+    def __call__(self, *args):
+        self.queue.put(args)
+
+    def _drain(self):
+        while True:
+            args = self.queue.get()
+            if args is None:
+                return
+            try:
+                self.progress_callback(*args)
+            except Exception:
+                # Keep draining, a dead dispatcher would block the sweep once the queue fills
+                logging.getLogger(__name__).exception("progress_callback failed")
+
+    def close(self):
+        """Deliver the queued calls and stop the dispatcher thread"""
+        self.queue.put(None)
+        self.thread.join()
+
+
+def sweep_devices(logger, device_items, hop_counts_data, timeout, handle_result, handle_skip,
+                  stop_callback=None, pause_callback=None, max_workers=8, resume_event=None,
+                  fields=None):
+    """
+    Query every device's om2m resource, up to max_workers requests at a time.
+    handle_skip(device_name, ip) is called first for all devices not in hop_counts.json,
+    then handle_result(device_name, ip, data) for each finished request, data being
+    the parsed JSON response or None. Both run on the calling thread.
+    resume_event, if given, is a threading.Event the controller clears while paused
+    and sets on resume or stop, so a paused sweep sleeps until it is woken.
+    fields is passed on to CoapRequestWindow.
+    Returns False if the test was stopped while paused, True otherwise.
+    """
+    # Partition in one pass so skipped devices are reported up front and the
+    # request loop below only sees devices that are worth querying
+    to_test = []
+    for device_name, ip in device_items:
+        if should_skip_device(ip, hop_counts_data):
+            logger.info("SKIPPED: %s (%s) - Not in hop_counts.json", device_name, ip)
+            handle_skip(device_name, ip)
+        else:
+            to_test.append((device_name, ip))
+
+    total_to_test = len(to_test)
+    window = CoapRequestWindow(stop_callback, fields)
+    try:
+        for index, (device_name, ip) in enumerate(to_test, 1):
+            if stop_callback and stop_callback():
+                logger.info("Test stopped by user")
+                break
+
+            # Check for pause
+            while pause_callback and pause_callback():
+                if resume_event is not None and not resume_event.is_set():
+                    resume_event.wait()  # Woken by resume or stop
+                else:
+                    time.sleep(0.5)  # Wait while paused
+                if stop_callback and stop_callback():  # Check stop while paused
+                    logger.info("Test stopped by user while paused")
+                    return False
+
+            # Wait for a free slot so pause/stop are honoured before each new request
+            while len(window) >= max_workers:
+                for tag, data in window.poll():
+                    handle_result(*tag, data)
+
+            # Stop pressed while waiting, poll() has already cancelled the window
+            if stop_callback and stop_callback():
+                logger.info("Test stopped by user")
+                break
+
+            logger.info("Testing device %d/%d: %s (%s)", index, total_to_test, device_name, ip)
+            window.submit(ip, timeout, (device_name, ip))
+
+        # Collect the requests still in flight
+        while window:
+            for tag, data in window.poll():
+                handle_result(*tag, data)
+
+        if stop_callback and stop_callback():
+            logger.info("Test stopped by user during CoAP call")
+        return True
+    finally:
+        window.close()
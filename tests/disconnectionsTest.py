@@ -7,7 +7,7 @@ Checks 'disconnected_total' via CoAP and logs results
 import subprocess
 import time
 from tests.logger import get_logger
-from tests.ip import FAN11_FSK_IPV6
+from tests.ip import FAN11_FSK_IPV6, FAN11_FSK_IPV6_ITEMS
 from tests.hopCountUtils import get_hop_count_for_ip, should_skip_device, create_skipped_result, load_hop_counts
 
 def check_disconnected_total(ip, timeout=120, stop_callback=None):
@@ -112,7 +112,7 @@ def check_all_devices(log_file=None, progress_callback=None, stop_callback=None,
     total_devices = len(FAN11_FSK_IPV6)
     current_device = 0
 
-    for device_name, ip in FAN11_FSK_IPV6.items():
+    for device_name, ip in FAN11_FSK_IPV6_ITEMS:
         if stop_callback and stop_callback():
             logger.info("Test stopped by user")
             break
@@ -130,7 +130,7 @@ def check_all_devices(log_file=None, progress_callback=None, stop_callback=None,
         # Check if device should be skipped
         if should_skip_device(ip, hop_counts_data):
             skipped_count += 1
-            hop_count = get_hop_count_for_ip(ip) if hop_counts_data else -1
+            hop_count = get_hop_count_for_ip(ip, hop_counts_data) if hop_counts_data else -1
             
             # Log the skip
             logger.info(f"SKIPPED: {device_name} ({ip}) - Not in hop_counts.json")
@@ -173,8 +173,7 @@ def check_all_devices(log_file=None, progress_callback=None, stop_callback=None,
         # Send device result to frontend
         if progress_callback:
             # Get hop count for the device
-            from tests.hopCountUtils import get_hop_count_for_ip
-            hop_count = get_hop_count_for_ip(ip)
+            hop_count = get_hop_count_for_ip(ip, hop_counts_data)
             
             device_result = {
                 'sr_no': current_device,
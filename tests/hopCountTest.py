@@ -3,7 +3,9 @@ import subprocess
 import sys
 from pprint import pprint
 from collections import deque
+from functools import lru_cache
 
+@lru_cache(maxsize=4096)
 def get_ipv6(string):
     """Extract IPv6 address from a given string"""
     ipv6_pattern = (
@@ -20,11 +22,20 @@ def generate_pattern(string):
     return f"(?<={string}: ).*"
 
 
+PROPERTY_KEY_PATTERN = re.compile(r"\w+")
+
+
 def get_properties(input_string: str) -> dict:
     """Extract key:value pairs like 'Key: Value' from the top section"""
-    key = re.findall(r"(\w+)\: ", input_string)
-    value = re.findall(generate_pattern(r"\w"), input_string)
-    return dict(zip(key, value))
+    properties = {}
+    for line in input_string.splitlines():
+        # Tree body lines are indented or drawn with | and `, stop there
+        if line.startswith((' ', '|', '`')):
+            break
+        key, sep, value = line.partition(': ')
+        if sep and PROPERTY_KEY_PATTERN.fullmatch(key):
+            properties[key] = value
+    return properties
 
 
 def get_groups(input_string: str) -> list:
@@ -49,7 +60,7 @@ def get_tree(input_string: str, debug=False):
     for line in bottom_lines:
         ipv6 = get_ipv6(line)
         if ipv6:
-            border_router = ipv6
+            border_router = sys.intern(ipv6)
             break
 
     if not border_router:
@@ -69,6 +80,8 @@ def get_tree(input_string: str, debug=False):
         current_node = get_ipv6(line)
         if not current_node:
             continue
+        # Interned so the dict lookups in compute_hop_counts hit the identity fast path
+        current_node = sys.intern(current_node)
 
         if debug:
             print(f"{' ' * indent}[Indent {indent}] {current_node}")
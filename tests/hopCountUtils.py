@@ -8,11 +8,20 @@ import json
 import os
 import subprocess
 import time
+from collections import Counter
 from datetime import datetime
-from tests.hopCountTest import get_dodac_properties, run_command
+from tests.hopCountTest import get_dodac_properties, get_ipv6, run_command
+
+try:
+    import orjson  # Optional, faster hop_counts.json (de)serialisation
+except ImportError:
+    orjson = None
 
 HOP_COUNT_FILE = "hop_counts.json"
 
+# Parsed hop_counts.json per path, keyed on (st_mtime_ns, st_size) so a rewrite invalidates it
+_HOP_CACHE = {}
+
 def fetch_hop_counts(timeout=30):
     """
     Fetch current hop counts from the network and return as dictionary
@@ -53,8 +62,14 @@ def save_hop_counts(hop_counts, file_path=None):
             'total_devices': len(hop_counts)
         }
         
-        with open(file_path, 'w') as f:
-            json.dump(data, f, indent=2)
+        # Serialise in one go; json.dump issues a write per token
+        if orjson is not None:
+            payload = orjson.dumps(data, option=orjson.OPT_INDENT_2)
+        else:
+            payload = json.dumps(data, indent=2).encode('utf-8')
+        with open(file_path, 'wb', buffering=1 << 16) as f:
+            f.write(payload)
+        clear_hop_count_cache()
         
         print(f"Hop counts saved to {file_path}")
         return True
@@ -72,23 +87,56 @@ def load_hop_counts(file_path=None):
         file_path = os.path.join(os.path.dirname(__file__), '..', HOP_COUNT_FILE)
     
     try:
-        if not os.path.exists(file_path):
+        try:
+            stat = os.stat(file_path)
+        except FileNotFoundError:
             print(f"Hop count file not found: {file_path}")
             return {}
         
-        with open(file_path, 'r') as f:
-            data = json.load(f)
+        signature = (stat.st_mtime_ns, stat.st_size)
+        cached = _HOP_CACHE.get(file_path)
+        if cached and cached[0] == signature:
+            return cached[1]
+        
+        with open(file_path, 'rb') as f:
+            raw = f.read()
+        data = orjson.loads(raw) if orjson is not None else json.loads(raw)
+        
+        # Normalise IP keys once so lookups are a single case-insensitive dict hit
+        if 'hop_counts' in data:
+            data['hop_counts'] = _lowercase_keys(data['hop_counts'])
+        else:
+            data = _lowercase_keys(data)
         
         hop_counts = data.get('hop_counts', {})
         timestamp = data.get('timestamp', 'Unknown')
         
         print(f"Loaded hop counts for {len(hop_counts)} devices (updated: {timestamp})")
+        _HOP_CACHE[file_path] = (signature, data)
         return data  # Return full data structure instead of just hop_counts
         
     except Exception as e:
         print(f"Error loading hop counts: {e}")
         return {}
 
+def clear_hop_count_cache():
+    """Drop cached hop_counts.json data and memoized tree lines so the next load starts fresh"""
+    _HOP_CACHE.clear()
+    get_ipv6.cache_clear()
+
+def _lowercase_keys(hop_counts):
+    """Return a copy of hop_counts with lowercase IP keys"""
+    return {ip.lower(): hop_count for ip, hop_count in hop_counts.items()}
+
+def _get_hop_count_map(hop_counts_data):
+    """
+    Return the IP -> hop count mapping from either data format
+    (new format with metadata, or old direct IP to hop count mapping)
+    """
+    if 'hop_counts' in hop_counts_data:
+        return hop_counts_data['hop_counts']
+    return hop_counts_data
+
 def get_hop_count_for_ip(ip, hop_counts_data=None):
     """
     Get hop count for a specific IP address
@@ -100,30 +148,9 @@ def get_hop_count_for_ip(ip, hop_counts_data=None):
     if hop_counts_data is None:
         hop_counts_data = load_hop_counts()
     
-    # Handle different data formats
     if isinstance(hop_counts_data, dict):
-        if 'hop_counts' in hop_counts_data:
-            # New format with metadata - case insensitive lookup
-            hop_counts = hop_counts_data['hop_counts']
-            # Try exact match first
-            if ip in hop_counts:
-                return hop_counts[ip]
-            # Try case insensitive match
-            ip_lower = ip.lower()
-            for stored_ip, hop_count in hop_counts.items():
-                if stored_ip.lower() == ip_lower:
-                    return hop_count
-            return -1
-        else:
-            # Old format - direct IP to hop count mapping
-            if ip in hop_counts_data:
-                return hop_counts_data[ip]
-            # Try case insensitive match
-            ip_lower = ip.lower()
-            for stored_ip, hop_count in hop_counts_data.items():
-                if stored_ip.lower() == ip_lower:
-                    return hop_count
-            return -1
+        # Keys are lowercased by load_hop_counts
+        return _get_hop_count_map(hop_counts_data).get(ip.lower(), -1)
     
     return -1
 
@@ -142,33 +169,65 @@ def should_skip_device(ip, hop_counts_data=None):
     if not hop_counts_data:
         return False
     
-    # Handle different data formats
     if isinstance(hop_counts_data, dict):
-        if 'hop_counts' in hop_counts_data:
-            # New format with metadata - case insensitive check
-            hop_counts = hop_counts_data['hop_counts']
-            # Try exact match first
-            if ip in hop_counts:
-                return False
-            # Try case insensitive match
-            ip_lower = ip.lower()
-            for stored_ip in hop_counts.keys():
-                if stored_ip.lower() == ip_lower:
-                    return False
-            return True  # Skip if not found
-        else:
-            # Old format - direct IP to hop count mapping
-            if ip in hop_counts_data:
-                return False
-            # Try case insensitive match
-            ip_lower = ip.lower()
-            for stored_ip in hop_counts_data.keys():
-                if stored_ip.lower() == ip_lower:
-                    return False
-            return True  # Skip if not found
+        # Skip if not found; keys are lowercased by load_hop_counts
+        return ip.lower() not in _get_hop_count_map(hop_counts_data)
     
     return False
 
+# Per-test-type field defaults for skipped devices; the identity fields are filled per call
+_SKIP_BASE = {
+    'ip': None,
+    'label': None,
+    'device_label': None,
+    'hop_count': -1,
+    'connection_status': 'Skipped',
+    'status': 'Skipped'
+}
+_SKIP_TEMPLATES = {
+    'ping': {
+        **_SKIP_BASE,
+        'packets_transmitted': 0,
+        'packets_received': 0,
+        'packets_tx': 0,
+        'packets_rx': 0,
+        'packet_loss': 0.0,
+        'loss_percent': 0.0,
+        'min_rtt': 0.0,
+        'max_rtt': 0.0,
+        'avg_rtt': 0.0,
+        'mdev': 0.0,
+        'min_time': '-',
+        'max_time': '-',
+        'avg_time': '-',
+        'mdev_time': '-'
+    },
+    'rssi': {
+        **_SKIP_BASE,
+        'rsl_in': '-',
+        'rsl_out': '-',
+        'signal_quality': 'Skipped',
+        'response_time': '-',
+        'link_status': 'Skipped'
+    },
+    'rpl': {
+        **_SKIP_BASE,
+        'rank': '-',
+        'rpl_rank': '-'
+    },
+    'disconnections': {
+        **_SKIP_BASE,
+        'disconnected_total': 0,
+        'disconnections_count': 0
+    },
+    'availability': {
+        **_SKIP_BASE,
+        'availability_status': 'Skipped',
+        'available': False
+    }
+}
+_SKIP_TEMPLATES['rssl'] = _SKIP_TEMPLATES['rssi']
+
 def create_skipped_result(test_type, ip, device_name, hop_count=None):
     """
     Create a standardized result object for skipped devices
@@ -179,57 +238,12 @@ def create_skipped_result(test_type, ip, device_name, hop_count=None):
         hop_count: Hop count if available, otherwise -1
     Returns: dict with standardized skipped result format
     """
-    base_result = {
-        'ip': ip,
-        'label': device_name,
-        'device_label': device_name,
-        'hop_count': hop_count if hop_count is not None else -1,
-        'connection_status': 'Skipped',
-        'status': 'Skipped'
-    }
-    
-    if test_type == 'ping':
-        base_result.update({
-            'packets_transmitted': 0,
-            'packets_received': 0,
-            'packets_tx': 0,
-            'packets_rx': 0,
-            'packet_loss': 0.0,
-            'loss_percent': 0.0,
-            'min_rtt': 0.0,
-            'max_rtt': 0.0,
-            'avg_rtt': 0.0,
-            'mdev': 0.0,
-            'min_time': '-',
-            'max_time': '-',
-            'avg_time': '-',
-            'mdev_time': '-'
-        })
-    elif test_type in ['rssi', 'rssl']:
-        base_result.update({
-            'rsl_in': '-',
-            'rsl_out': '-',
-            'signal_quality': 'Skipped',
-            'response_time': '-',
-            'link_status': 'Skipped'
-        })
-    elif test_type == 'rpl':
-        base_result.update({
-            'rank': '-',
-            'rpl_rank': '-'
-        })
-    elif test_type == 'disconnections':
-        base_result.update({
-            'disconnected_total': 0,
-            'disconnections_count': 0
-        })
-    elif test_type == 'availability':
-        base_result.update({
-            'availability_status': 'Skipped',
-            'available': False
-        })
-    
-    return base_result
+    result = dict(_SKIP_TEMPLATES.get(test_type, _SKIP_BASE))
+    result['ip'] = ip
+    result['label'] = device_name
+    result['device_label'] = device_name
+    result['hop_count'] = hop_count if hop_count is not None else -1
+    return result
 
 def refresh_hop_counts():
     """
@@ -259,14 +273,10 @@ def get_hop_count_summary():
     hop_counts = hop_counts_data.get('hop_counts', {}) if isinstance(hop_counts_data, dict) else hop_counts_data
     
     # Count devices by hop level
-    hop_levels = {}
-    for ip, hop_count in hop_counts.items():
-        if isinstance(hop_count, int):
-            hop_levels[hop_count] = hop_levels.get(hop_count, 0) + 1
+    hop_levels = Counter(hop_count for hop_count in hop_counts.values() if isinstance(hop_count, int))
     
     summary_lines = [f"Total devices: {len(hop_counts)}"]
-    for hop_level in sorted(hop_levels.keys()):
-        summary_lines.append(f"Hop {hop_level}: {hop_levels[hop_level]} devices")
+    summary_lines.extend(f"Hop {hop_level}: {hop_levels[hop_level]} devices" for hop_level in sorted(hop_levels))
     
     return "\n".join(summary_lines)
 
@@ -7,6 +7,9 @@ Reusable logging functionality for all scripts
 import logging
 import os
 
+# Logger name -> the FileHandler setup_logger attached to that logger
+_FILE_HANDLERS = {}
+
 
 def setup_logger(name, log_file=None, log_level=logging.INFO):
     """
@@ -36,9 +39,27 @@ def setup_logger(name, log_file=None, log_level=logging.INFO):
     logger = logging.getLogger(name)
     logger.setLevel(log_level)
 
-    # Clear existing handlers
+    # Already set up under this name: keep the console handler and formatter,
+    # and only swap the file handler when a run asks for a different log file
+    previous = _FILE_HANDLERS.get(name)
+    if previous is not None and previous in logger.handlers:
+        for handler in logger.handlers:
+            handler.setLevel(log_level)
+        if previous.baseFilename == os.path.abspath(log_file):
+            return logger
+        logger.removeHandler(previous)
+        previous.close()
+        file_handler = logging.FileHandler(log_file)
+        file_handler.setLevel(log_level)
+        file_handler.setFormatter(previous.formatter)
+        logger.addHandler(file_handler)
+        _FILE_HANDLERS[name] = file_handler
+        return logger
+
+    # Clear existing handlers, closing them so earlier log files are released
     for handler in logger.handlers[:]:
         logger.removeHandler(handler)
+        handler.close()
 
     # File handler
     file_handler = logging.FileHandler(log_file)
@@ -60,6 +81,7 @@ def setup_logger(name, log_file=None, log_level=logging.INFO):
     logger.addHandler(file_handler)
     logger.addHandler(console_handler)
 
+    _FILE_HANDLERS[name] = file_handler
     return logger
 
 
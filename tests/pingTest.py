@@ -4,45 +4,59 @@ Ping Test Module
 Pings all devices and logs results
 """
 
+import shutil
 import subprocess
 import re
 import time
+from concurrent.futures import ThreadPoolExecutor, wait, as_completed, FIRST_COMPLETED
 from tests.logger import get_logger
-from tests.ip import FAN11_FSK_IPV6
+from tests.ip import FAN11_FSK_IPV6, FAN11_FSK_IPV6_ITEMS
 from tests.hopCountUtils import get_hop_count_for_ip, should_skip_device, create_skipped_result, load_hop_counts
 
 timeout = 120
 packet_count = 100
+max_workers = 8
+
+PING_STATS_PATTERN = re.compile(r"(\d+) packets transmitted, (\d+) received, ([0-9.]+)% packet loss")
+PING_RTT_PATTERN = re.compile(r"= ([0-9.]+)/([0-9.]+)/([0-9.]+)/([0-9.]+)")
+# fping -q per-host summary, e.g. "fd12::1 : xmt/rcv/%loss = 100/98/2%, min/avg/max = 0.3/0.4/1.2"
+FPING_SUMMARY_PATTERN = re.compile(
+    r"^(\S+)\s+: xmt/rcv/%loss = (\d+)/(\d+)/([0-9.]+)%"
+    r"(?:, min/avg/max = ([0-9.]+)/([0-9.]+)/([0-9.]+))?"
+)
 
 
 # ---------- Ping Core Functions ----------
 def ping_device(ip, count=packet_count, timeout_per_packet=timeout, stop_callback=None):
-    """Ping a single device and return parsed results. If stop_callback returns True, terminate early."""
+    """Ping a single device and return parsed results. If stop_callback returns True, terminate early and return None."""
     cmd = ["ping", "-c", str(count), "-W", str(timeout_per_packet), ip]
     proc = None
     output = ''
     try:
         proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+        if stop_callback is None:
+            # Nothing to poll for, so block once. ping sends one packet a second
+            # and then waits up to timeout_per_packet for the last reply.
+            output, err = proc.communicate(timeout=count + timeout_per_packet + 5)
         # Loop and periodically check stop_callback
-        while True:
+        while stop_callback is not None:
             try:
-                out, err = proc.communicate(timeout=1)
-                output += out or ''
+                # communicate() hands back the whole output once the process exits
+                output, err = proc.communicate(timeout=1)
                 break
             except subprocess.TimeoutExpired:
                 # ping still running; check stop flag
                 if stop_callback and stop_callback():
-                    # terminate process and return failed result
+                    # terminate process, a cancelled ping has no result
                     try:
                         proc.terminate()
-                        out, err = proc.communicate(timeout=2)
-                        output += out or ''
+                        proc.communicate(timeout=2)
                     except Exception:
                         try:
                             proc.kill()
                         except Exception:
                             pass
-                    return _failed_result(count)
+                    return None
                 # otherwise continue waiting
                 continue
 
@@ -66,29 +80,71 @@ def ping_device(ip, count=packet_count, timeout_per_packet=timeout, stop_callbac
         return _failed_result(count)
 
 
+def ping_devices_batched(ips, count=packet_count, timeout_per_packet=timeout):
+    """
+    Ping several devices with a single fping run.
+    Returns dict of ip -> result in ping_device's format, or None if fping could not be run.
+    fping reports no mdev, so it is left at 0.0.
+    """
+    ips = list(ips)
+    if not ips:
+        # With no hosts fping would read its targets from stdin
+        return {}
+    cmd = ["fping", "-q", "-c", str(count), "-t", str(int(timeout_per_packet * 1000)), *ips]
+    try:
+        proc = subprocess.run(cmd, capture_output=True, text=True, stdin=subprocess.DEVNULL,
+                              timeout=count + timeout_per_packet + 5)
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+
+    parsed = {}
+    # fping writes the per-host summaries to stderr
+    for line in proc.stderr.splitlines():
+        match = FPING_SUMMARY_PATTERN.match(line)
+        if not match:
+            continue
+        host, sent, received, loss, min_rtt, avg_rtt, max_rtt = match.groups()
+        if int(received) == 0:
+            continue
+        parsed[host.lower()] = {
+            "packets_transmitted": int(sent),
+            "packets_received": int(received),
+            "packet_loss": float(loss),
+            "min_rtt": float(min_rtt or 0.0),
+            "avg_rtt": float(avg_rtt or 0.0),
+            "max_rtt": float(max_rtt or 0.0),
+            "mdev": 0.0,
+        }
+
+    return {ip: parsed.get(ip.lower()) or _failed_result(count) for ip in ips}
+
+
 def parse_ping_output(ping_output):
     """Parse ping output and extract key statistics"""
     transmitted = received = 0
     loss = 100.0
     min_rtt = avg_rtt = max_rtt = mdev = 0.0
 
-    lines = ping_output.splitlines()
+    found_stats = found_rtt = False
 
-    for line in lines:
-        if "packets transmitted" in line:
-            match = re.search(
-                r"(\d+) packets transmitted, (\d+) received, ([0-9.]+)% packet loss",
-                line
-            )
+    for line in ping_output.splitlines():
+        if not found_stats and "packets transmitted" in line:
+            match = PING_STATS_PATTERN.search(line)
             if match:
                 transmitted = int(match.group(1))
                 received = int(match.group(2))
                 loss = float(match.group(3))
+                found_stats = True
 
-        elif "rtt min/avg/max/mdev" in line:
-            match = re.search(r"= ([0-9.]+)/([0-9.]+)/([0-9.]+)/([0-9.]+)", line)
+        elif not found_rtt and "rtt min/avg/max/mdev" in line:
+            match = PING_RTT_PATTERN.search(line)
             if match:
                 min_rtt, avg_rtt, max_rtt, mdev = map(float, match.groups())
+                found_rtt = True
+
+        # Both summary lines seen, the rest is irrelevant
+        if found_stats and found_rtt:
+            break
 
     return {
         "packets_transmitted": transmitted,
@@ -138,8 +194,12 @@ def log_device_result(logger, device_name, ip, result_data):
 
 
 # ---------- Main Test Runner ----------
-def ping_all_devices(log_path=None, progress_callback=None, stop_callback=None, count=100, timeout_val=120, pause_callback=None):
-    """Ping all devices and save results"""
+def ping_all_devices(log_path=None, progress_callback=None, stop_callback=None, count=100, timeout_val=120, pause_callback=None, max_workers=max_workers):
+    """
+    Ping all devices concurrently (up to max_workers at a time) and save results.
+    Without progress, stop or pause callbacks there is nothing to report or
+    honour per device, so all devices are pinged by one fping run when available.
+    """
     global packet_count, timeout
     packet_count = count
     timeout = timeout_val
@@ -156,55 +216,21 @@ def ping_all_devices(log_path=None, progress_callback=None, stop_callback=None,
     success, fail, skipped = 0, 0, 0
     total_devices = len(FAN11_FSK_IPV6)
     current_device = 0
-
-    for device_name, ip in FAN11_FSK_IPV6.items():
-        # Check for stop
-        if stop_callback and stop_callback():
-            logger.info("Test stopped by user")
-            break
-
-        # Handle pause: if pause_callback is provided and returns True, wait until it's False
-        while pause_callback and pause_callback():
-            time.sleep(0.5)
-            # Check for stop while paused
-            if stop_callback and stop_callback():
-                logger.info("Test stopped by user while paused")
-                return success, fail, skipped
-
+    pending = {}  # future -> (device_name, ip)
+    batched_results = None
+    if progress_callback is None and stop_callback is None and pause_callback is None and shutil.which("fping"):
+        batched_results = ping_devices_batched(
+            [ip for _, ip in FAN11_FSK_IPV6_ITEMS if not should_skip_device(ip, hop_counts_data)],
+            count, timeout_val
+        )
+
+    def report_ping(device_name, ip, result):
+        """Count, log and forward the result of a finished ping"""
+        nonlocal success, fail, current_device
+        # A ping cancelled by the stop button is not a device failure
+        if result is None:
+            return
         current_device += 1
-        
-        # Check if device should be skipped
-        if should_skip_device(ip, hop_counts_data):
-            skipped += 1
-            hop_count = get_hop_count_for_ip(ip) if hop_counts_data else -1
-            
-            # Create skipped result
-            result = create_skipped_result('ping', ip, device_name, hop_count)
-            
-            # Log the skip
-            logger.info(f"SKIPPED: {device_name} ({ip}) - Not in hop_counts.json")
-            
-            # Send skipped result to progress callback
-            if progress_callback:
-                device_result = {
-                    'ip': ip,
-                    'label': device_name,
-                    'hop_count': '-',
-                    'packets_tx': 0,
-                    'packets_rx': 0,
-                    'loss_percent': '-',
-                    'min_time': '-',
-                    'max_time': '-',
-                    'avg_time': '-',
-                    'mdev_time': '-',
-                    'connection_status': 'Skipped'
-                }
-                progress_callback(current_device, total_devices, f"Skipped {device_name}", device_result)
-            
-            continue
-
-        # Normal ping test for non-skipped devices
-        result = ping_device(ip, count, timeout_val, stop_callback)
 
         if result["packets_received"] > 0:
             success += 1
@@ -229,6 +255,77 @@ def ping_all_devices(log_path=None, progress_callback=None, stop_callback=None,
             }
             progress_callback(current_device, total_devices, f"Testing {device_name}", device_result)
 
+    def collect_pending():
+        """Report the pings still in flight, as they finish"""
+        for future in as_completed(list(pending)):
+            report_ping(*pending.pop(future), future.result())
+
+    # Pings are I/O bound, so run up to max_workers of them at once. Results are
+    # handled here on the calling thread, which keeps counters, logging and
+    # progress_callback single-threaded.
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for device_name, ip in FAN11_FSK_IPV6_ITEMS:
+            # Check for stop
+            if stop_callback and stop_callback():
+                logger.info("Test stopped by user")
+                break
+
+            # Handle pause: if pause_callback is provided and returns True, wait until it's False
+            while pause_callback and pause_callback():
+                time.sleep(0.5)
+                # Check for stop while paused
+                if stop_callback and stop_callback():
+                    logger.info("Test stopped by user while paused")
+                    collect_pending()
+                    return success, fail, skipped
+
+            # Check if device should be skipped
+            if should_skip_device(ip, hop_counts_data):
+                skipped += 1
+                current_device += 1
+                hop_count = get_hop_count_for_ip(ip, hop_counts_data) if hop_counts_data else -1
+            
+                # Create skipped result
+                result = create_skipped_result('ping', ip, device_name, hop_count)
+            
+                # Log the skip
+                logger.info(f"SKIPPED: {device_name} ({ip}) - Not in hop_counts.json")
+            
+                # Send skipped result to progress callback
+                if progress_callback:
+                    device_result = {
+                        'ip': ip,
+                        'label': device_name,
+                        'hop_count': '-',
+                        'packets_tx': 0,
+                        'packets_rx': 0,
+                        'loss_percent': '-',
+                        'min_time': '-',
+                        'max_time': '-',
+                        'avg_time': '-',
+                        'mdev_time': '-',
+                        'connection_status': 'Skipped'
+                    }
+                    progress_callback(current_device, total_devices, f"Skipped {device_name}", device_result)
+            
+                continue
+
+            if batched_results is not None:
+                report_ping(device_name, ip, batched_results[ip])
+                continue
+
+            # Wait for a free worker so pause/stop are honoured before each new ping
+            while len(pending) >= max_workers:
+                done, _ = wait(list(pending), return_when=FIRST_COMPLETED)
+                for future in done:
+                    report_ping(*pending.pop(future), future.result())
+
+            future = executor.submit(ping_device, ip, count, timeout_val, stop_callback)
+            pending[future] = (device_name, ip)
+
+        # Collect the pings still in flight
+        collect_pending()
+
     # Calculate test duration
     test_end_time = time.time()
     total_duration = test_end_time - test_start_time
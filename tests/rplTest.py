@@ -4,12 +4,15 @@ CoAP RPL Rank Fetcher
 Fetches 'rpl_rank' from a CoAP endpoint and logs results
 """
 
-import subprocess
-import json
 import time
 from tests.logger import get_logger
-from tests.ip import FAN11_FSK_IPV6
-from tests.hopCountUtils import get_hop_count_for_ip, should_skip_device, create_skipped_result, load_hop_counts
+from tests.coapUtils import CoapRequestWindow, ProgressDispatcher, sweep_devices
+from tests.ip import FAN11_FSK_IPV6, FAN11_FSK_IPV6_ITEMS
+from tests.hopCountUtils import get_hop_count_for_ip, load_hop_counts
+
+max_workers = 8
+# Only these response fields are read, so they are extracted without a full JSON parse
+RPL_FIELDS = ("rpl_rank",)
 
 def get_rpl_rank(ip, timeout=100, stop_callback=None):
     """
@@ -17,121 +20,45 @@ def get_rpl_rank(ip, timeout=100, stop_callback=None):
     Returns rpl_rank int or None if failed.
     Now supports stop_callback for early termination.
     """
-    cmd = [
-        "coap-client-notls",
-        "-m", "post",
-        "-N",           # Non-confirmable
-        "-B", str(timeout),
-        "-t", "text",
-        f"coap://[{ip}]:5683/om2m"
-    ]
-
+    window = CoapRequestWindow(stop_callback, RPL_FIELDS)
     try:
-        proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
-        output = ''
-        
-        # Loop and periodically check stop_callback
-        while True:
-            try:
-                out, err = proc.communicate(timeout=1)
-                output += out or ''
-                break
-            except subprocess.TimeoutExpired:
-                # CoAP command still running; check stop flag
-                if stop_callback and stop_callback():
-                    # terminate process and return None
-                    try:
-                        proc.terminate()
-                        try:
-                            proc.communicate(timeout=2)
-                        except subprocess.TimeoutExpired:
-                            proc.kill()
-                            proc.communicate(timeout=1)
-                    except Exception as e:
-                        # Process cleanup failed, but continue
-                        pass
-                    return None
-                # otherwise continue waiting
-            except Exception as e:
-                # Unexpected error in communicate, terminate and return None
-                try:
-                    if proc.poll() is None:  # Process still running
-                        proc.terminate()
-                        proc.communicate(timeout=2)
-                except Exception:
-                    pass
-                return None
-
-        if proc.returncode != 0 or not output:
-            return None
-
-        # Parse JSON
-        data = json.loads(output)
-        return data.get("rpl_rank", None)
-    except Exception as e:
+        window.submit(ip, timeout)
+        # A single request, so the first batch of results is the only one
+        for _, data in window.poll():
+            return data.get("rpl_rank", None) if data else None
+        return None
+    except Exception:
         # Catch any other unexpected errors
         return None
+    finally:
+        window.close()
 
 
-def fetch_rpl_for_all(log_file=None, progress_callback=None, stop_callback=None, timeout_val=100, pause_callback=None):
+def fetch_rpl_for_all(log_file=None, progress_callback=None, stop_callback=None, timeout_val=100, pause_callback=None, max_workers=max_workers, resume_event=None):
+    """
+    Fetch the RPL rank of every device, up to max_workers requests at a time.
+    """
     # Track test start time
-    import time
     test_start_time = time.time()
     
     # Load hop counts data once for efficiency
     hop_counts_data = load_hop_counts()
     
     logger = get_logger("rpl_rank_test", log_file)
-    logger.info(f"=== RPL RANK TEST STARTED ({len(FAN11_FSK_IPV6)} devices) ===")
+    logger.info("=== RPL RANK TEST STARTED (%d devices) ===", len(FAN11_FSK_IPV6))
 
     success, fail, skipped = 0, 0, 0
     total_devices = len(FAN11_FSK_IPV6)
     current_device = 0
+    if progress_callback:
+        progress_callback = ProgressDispatcher(progress_callback)
 
-    for device_name, ip in FAN11_FSK_IPV6.items():
-        if stop_callback and stop_callback():
-            logger.info("Test stopped by user")
-            break
-            
-        # Check for pause
-        while pause_callback and pause_callback():
-            time.sleep(0.5)  # Wait while paused
-            if stop_callback and stop_callback():  # Check stop while paused
-                logger.info("Test stopped by user while paused")
-                return success, fail, skipped
-        
+    def report_rpl(device_name, ip, data):
+        """Count, log and forward the parsed response of a finished CoAP request"""
+        nonlocal success, fail, current_device
         current_device += 1
-        
-        # Check if device should be skipped
-        if should_skip_device(ip, hop_counts_data):
-            skipped += 1
-            hop_count = get_hop_count_for_ip(ip) if hop_counts_data else -1
-            
-            # Log the skip
-            logger.info(f"SKIPPED: {device_name} ({ip}) - Not in hop_counts.json")
-            
-            # Send skipped result to progress callback
-            if progress_callback:
-                device_result = {
-                    'ip': ip,
-                    'label': device_name,
-                    'hop_count': '-',
-                    'rank': '-',
-                    'rpl_rank': '-',
-                    'connection_status': 'Skipped'
-                }
-                progress_callback(current_device, total_devices, f"Skipped {device_name}", device_result)
-            
-            continue
-        logger.info(f"Testing device {current_device}/{total_devices}: {device_name} ({ip})")
-            
-        rpl_rank = get_rpl_rank(ip, timeout_val, stop_callback)
-        
-        # Check if stopped during get_rpl_rank call
-        if stop_callback and stop_callback():
-            logger.info("Test stopped by user during CoAP call")
-            break
-            
+        rpl_rank = data.get("rpl_rank") if data else None
+
         if rpl_rank is not None:
             status = "SUCCESS ✅"
             success += 1
@@ -142,16 +69,14 @@ def fetch_rpl_for_all(log_file=None, progress_callback=None, stop_callback=None,
             fail += 1
             connection_status = "Disconnected"
 
-        logger.info(f"Device: {device_name} | IP: {ip} | Status: {status}")
-        logger.info(f"RPL Rank: {rpl_rank}")
-        logger.info("-" * 50)
+        # One record per device, formatted by logging only if it is emitted
+        logger.info("Device: %s | IP: %s | Status: %s | RPL Rank: %s", device_name, ip, status, rpl_rank)
 
         # Send device result to frontend
         if progress_callback:
             # Get hop count for the device
-            from tests.hopCountUtils import get_hop_count_for_ip
-            hop_count = get_hop_count_for_ip(ip)
-            
+            hop_count = get_hop_count_for_ip(ip, hop_counts_data)
+        
             device_result = {
                 'sr_no': current_device,
                 'ip': ip,
@@ -163,6 +88,33 @@ def fetch_rpl_for_all(log_file=None, progress_callback=None, stop_callback=None,
             }
             progress_callback(current_device, total_devices, f"Testing {device_name}", device_result)
 
+    def report_skip(device_name, ip):
+        """Count and forward a device that is not in hop_counts.json"""
+        nonlocal skipped, current_device
+        skipped += 1
+        current_device += 1
+
+        # Send skipped result to progress callback
+        if progress_callback:
+            device_result = {
+                'ip': ip,
+                'label': device_name,
+                'hop_count': '-',
+                'rank': '-',
+                'rpl_rank': '-',
+                'connection_status': 'Skipped'
+            }
+            progress_callback(current_device, total_devices, f"Skipped {device_name}", device_result)
+
+    try:
+        if not sweep_devices(logger, FAN11_FSK_IPV6_ITEMS, hop_counts_data, timeout_val, report_rpl, report_skip,
+                             stop_callback, pause_callback, max_workers, resume_event, RPL_FIELDS):
+            return success, fail, skipped
+    finally:
+        # Deliver queued progress even when stopped or paused out early
+        if progress_callback:
+            progress_callback.close()
+
     # Calculate test duration
     test_end_time = time.time()
     total_duration = test_end_time - test_start_time
@@ -4,11 +4,15 @@ CoAP RSL Fetcher
 Fetches 'rsl_in' and 'rsl_out' from a CoAP endpoint and logs results
 """
 
-import subprocess
-import json
+import time
 from tests.logger import get_logger
-from tests.ip import FAN11_FSK_IPV6
-from tests.hopCountUtils import get_hop_count_for_ip, should_skip_device, create_skipped_result, load_hop_counts
+from tests.coapUtils import CoapRequestWindow, ProgressDispatcher, sweep_devices
+from tests.ip import FAN11_FSK_IPV6, FAN11_FSK_IPV6_ITEMS
+from tests.hopCountUtils import load_hop_counts
+
+max_workers = 8
+# Only these response fields are read, so they are extracted without a full JSON parse
+RSL_FIELDS = ("rsl_in", "rsl_out")
 
 def get_rsl(ip, timeout=100, stop_callback=None):
     """
@@ -16,108 +20,43 @@ def get_rsl(ip, timeout=100, stop_callback=None):
     Returns tuple (rsl_in, rsl_out) or (None, None) if failed.
     Now supports stop_callback for early termination.
     """
-    cmd = [
-        "coap-client-notls",
-        "-m", "post",
-        "-N",           # Non-confirmable
-        "-B", str(timeout),
-        "-t", "text",
-        f"coap://[{ip}]:5683/om2m"
-    ]
-
+    window = CoapRequestWindow(stop_callback, RSL_FIELDS)
     try:
-        proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
-        output = ''
-        
-        # Loop and periodically check stop_callback
-        while True:
-            try:
-                out, err = proc.communicate(timeout=1)
-                output += out or ''
-                break
-            except subprocess.TimeoutExpired:
-                # CoAP command still running; check stop flag
-                if stop_callback and stop_callback():
-                    # terminate process and return None
-                    try:
-                        proc.terminate()
-                        proc.communicate(timeout=2)
-                    except Exception:
-                        try:
-                            proc.kill()
-                        except Exception:
-                            pass
-                    return None, None
-                # otherwise continue waiting
-
-        if proc.returncode != 0 or not output:
-            return None, None
-
-        # Parse JSON
-        data = json.loads(output)
-        rsl_in = data.get("rsl_in", None)
-        rsl_out = data.get("rsl_out", None)
-        return rsl_in, rsl_out
+        window.submit(ip, timeout)
+        # A single request, so the first batch of results is the only one
+        for _, data in window.poll():
+            if data:
+                return data.get("rsl_in", None), data.get("rsl_out", None)
+        return None, None
     except Exception:
         return None, None
+    finally:
+        window.close()
 
 
-def fetch_rsl_for_all(log_file=None, progress_callback=None, stop_callback=None, timeout_val=100, pause_callback=None):
+def fetch_rsl_for_all(log_file=None, progress_callback=None, stop_callback=None, timeout_val=100, pause_callback=None, max_workers=max_workers, resume_event=None):
+    """Fetch rsl_in/rsl_out of every device, up to max_workers requests at a time"""
     # Track test start time
-    import time
     test_start_time = time.time()
     
     # Load hop counts data once for efficiency
     hop_counts_data = load_hop_counts()
     
     logger = get_logger("rsl_test", log_file)
-    logger.info(f"=== RSL TEST STARTED ({len(FAN11_FSK_IPV6)} devices) ===")
+    logger.info("=== RSL TEST STARTED (%d devices) ===", len(FAN11_FSK_IPV6))
 
     success, fail, skipped = 0, 0, 0
     total_devices = len(FAN11_FSK_IPV6)
     current_device = 0
+    if progress_callback:
+        progress_callback = ProgressDispatcher(progress_callback)
 
-    for device_name, ip in FAN11_FSK_IPV6.items():
-        if stop_callback and stop_callback():
-            logger.info("Test stopped by user")
-            break
-            
-        # Handle pause functionality
-        if pause_callback:
-            while pause_callback():
-                logger.info("Test paused, waiting...")
-                import time
-                time.sleep(1)
-                if stop_callback and stop_callback():
-                    logger.info("Test stopped while paused")
-                    return success, fail, skipped
-            
+    def report_rsl(device_name, ip, data):
+        """Count, log and forward the parsed response of a finished CoAP request"""
+        nonlocal success, fail, current_device
+        rsl_in, rsl_out = (data.get("rsl_in"), data.get("rsl_out")) if data else (None, None)
         current_device += 1
-        
-        # Check if device should be skipped
-        if should_skip_device(ip, hop_counts_data):
-            skipped += 1
-            hop_count = get_hop_count_for_ip(ip) if hop_counts_data else -1
-            
-            # Log the skip
-            logger.info(f"SKIPPED: {device_name} ({ip}) - Not in hop_counts.json")
-            
-            # Send skipped result to progress callback
-            if progress_callback:
-                device_result = {
-                    'ip': ip,
-                    'label': device_name,
-                    'hop_count': '-',
-                    'rsl_in': '-',
-                    'rsl_out': '-',
-                    'connection_status': 'Skipped'
-                }
-                progress_callback(current_device, total_devices, f"Skipped {device_name}", device_result)
-            
-            continue
-        
-        rsl_in, rsl_out = get_rsl(ip, timeout_val, stop_callback)
-        
+
         if rsl_in is not None and rsl_out is not None:
             status = "SUCCESS ✅"
             success += 1
@@ -128,9 +67,9 @@ def fetch_rsl_for_all(log_file=None, progress_callback=None, stop_callback=None,
             fail += 1
             connection_status = "Failed"
 
-        logger.info(f"Device: {device_name} | IP: {ip} | Status: {status}")
-        logger.info(f"RSL In: {rsl_in} | RSL Out: {rsl_out}")
-        logger.info("-" * 50)
+        # One record per device, formatted by logging only if it is emitted
+        logger.info("Device: %s | IP: %s | Status: %s | RSL In: %s | RSL Out: %s",
+                    device_name, ip, status, rsl_in, rsl_out)
         
         # Prepare device result for frontend display
         if progress_callback:
@@ -143,6 +82,32 @@ def fetch_rsl_for_all(log_file=None, progress_callback=None, stop_callback=None,
             }
             progress_callback(current_device, total_devices, f"Testing {device_name}", device_result)
 
+    def report_skip(device_name, ip):
+        """Count and forward a device that is not in hop_counts.json"""
+        nonlocal skipped, current_device
+        skipped += 1
+        current_device += 1
+
+        # Send skipped result to progress callback
+        if progress_callback:
+            device_result = {
+                'ip': ip,
+                'label': device_name,
+                'hop_count': '-',
+                'rsl_in': '-',
+                'rsl_out': '-',
+                'connection_status': 'Skipped'
+            }
+            progress_callback(current_device, total_devices, f"Skipped {device_name}", device_result)
+
+    try:
+        if not sweep_devices(logger, FAN11_FSK_IPV6_ITEMS, hop_counts_data, timeout_val, report_rsl, report_skip,
+                             stop_callback, pause_callback, max_workers, resume_event, RSL_FIELDS):
+            return success, fail, skipped
+    finally:
+        if progress_callback:
+            progress_callback.close()
+
     # Calculate test duration
     test_end_time = time.time()
     total_duration = test_end_time - test_start_time
@@ -8,24 +8,45 @@ import os
 from datetime import datetime
 from typing import Dict, List, Tuple, Optional
 
+try:
+    import orjson  # Optional, faster hop_counts.json parsing
+except ImportError:
+    orjson = None
+
 class HopCountManager:
     def __init__(self, hop_counts_file='hop_counts.json'):
         self.hop_counts_file = hop_counts_file
         self.hop_counts_data = None
         self.connected_devices = set()
         self.all_devices = set()
+        self._hops = {}  # lowercase IP -> hop count
+        self._file_signature = None  # (st_mtime_ns, st_size) of the last loaded file
         self.load_hop_counts()
     
+    def _stat_signature(self) -> Optional[Tuple[int, int]]:
+        """Return (st_mtime_ns, st_size) of the hop counts file, or None if it is missing"""
+        try:
+            stat = os.stat(self.hop_counts_file)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+    
     def load_hop_counts(self):
         """Load hop counts from JSON file"""
+        self._file_signature = None
+        self._hops = {}
         try:
-            if os.path.exists(self.hop_counts_file):
-                with open(self.hop_counts_file, 'r') as f:
-                    self.hop_counts_data = json.load(f)
+            signature = self._stat_signature()
+            if signature is not None:
+                with open(self.hop_counts_file, 'rb') as f:
+                    raw = f.read()
+                    self.hop_counts_data = orjson.loads(raw) if orjson is not None else json.loads(raw)
                     if 'hop_counts' in self.hop_counts_data:
-                        # Normalize IP addresses to lowercase for consistent comparison
-                        self.connected_devices = set(ip.lower() for ip in self.hop_counts_data['hop_counts'].keys())
+                        # Normalize IP addresses to lowercase once for consistent comparison
+                        self._hops = {ip.lower(): hop for ip, hop in self.hop_counts_data['hop_counts'].items()}
+                        self.connected_devices = set(self._hops)
                         self.all_devices = self.connected_devices.copy()
+                self._file_signature = signature
             else:
                 self.hop_counts_data = {"hop_counts": {}, "total_devices": 0}
         except Exception as e:
@@ -40,11 +61,7 @@ class HopCountManager:
     
     def get_hop_count(self, ip_address: str) -> Optional[int]:
         """Get hop count for a specific device"""
-        if self.hop_counts_data and 'hop_counts' in self.hop_counts_data:
-            # Normalize IP address to lowercase for comparison
-            ip_normalized = ip_address.lower()
-            return self.hop_counts_data['hop_counts'].get(ip_normalized)
-        return None
+        return self._hops.get(ip_address.lower())
     
     def get_connected_devices(self) -> List[str]:
         """Get list of all connected devices"""
@@ -100,7 +117,10 @@ class HopCountManager:
         return len(self.connected_devices)
     
     def refresh_hop_counts(self):
-        """Reload hop counts from file"""
+        """Reload hop counts from file if it changed since the last load"""
+        signature = self._stat_signature()
+        if signature is not None and signature == self._file_signature:
+            return
         self.load_hop_counts()
 
 # Global instance for easy access
@@ -5,11 +5,69 @@ Functions to generate Wi-SUN tree reports in different formats (PDF, Word, TXT)
 """
 
 import os
+import re
+import csv
 import json
 from datetime import datetime
-from io import BytesIO
+from functools import lru_cache
+from typing import NamedTuple
+from io import BytesIO, StringIO
 import tempfile
 
+try:
+    import orjson  # Optional, faster JSON report serialisation
+except ImportError:
+    orjson = None
+
+# PDF and Word support are optional, imported once here rather than on every report
+try:
+    from reportlab.lib.pagesizes import A4
+    from reportlab.platypus import SimpleDocTemplate, Paragraph, Preformatted, Spacer, Table, TableStyle
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+    from reportlab.lib.units import inch
+    from reportlab.lib import colors
+    from reportlab.lib.enums import TA_CENTER
+    _HAS_REPORTLAB = True
+except ImportError:
+    _HAS_REPORTLAB = False
+
+try:
+    from docx import Document
+    from docx.enum.text import WD_ALIGN_PARAGRAPH
+    _HAS_DOCX = True
+except ImportError:
+    _HAS_DOCX = False
+
+# Network configuration keys reported by wsbrd_cli, stored as "key: value" lines
+_NET_KEYS = frozenset({
+    'network_name', 'fan_version', 'domain', 'phy_mode_id', 'chan_plan_id', 'panid', 'size'
+})
+
+# A whole "key: value" network configuration line, for scanning the full tree text at once
+_NET_LINE_PATTERN = re.compile(
+    r'^[^\S\n]*(' + '|'.join(sorted(_NET_KEYS)) + r'):(.*)$', re.MULTILINE
+)
+
+# A device line: a tree branch whose last whitespace separated token is an IPv6 address
+# (group 1), or a bare fd12: address (group 2). Callers only match lines that contain
+# "::", so compressed addresses like fd12::9 are accepted as well as fd12:3456::1
+_TREE_LINE_PATTERN = re.compile(r'^(?:(?=[├└]─)(?:.*\s)?(\S*::\S*)|((?:fd12|FD12):.*))$')
+
+# Tree lines are indented two columns per level
+_INDENT_SHIFT = 1
+
+# XML text escapes, applied in one C-level str.translate pass per value
+_XML_ESCAPES = str.maketrans({'&': '&amp;', '<': '&lt;', '>': '&gt;'})
+
+# Characters that make csv.writer quote a field in its default dialect
+_CSV_NEEDS_QUOTE = re.compile(r'[",\r\n]')
+
+class TreeDevice(NamedTuple):
+    """A device row of the Wi-SUN tree, a plain tuple instead of a dict per device"""
+    ipv6: str
+    indent_level: int
+    line: str
+
 def parse_wisun_tree_data(tree_output):
     """
     Parse Wi-SUN tree output to extract structured data
@@ -18,251 +76,240 @@ def parse_wisun_tree_data(tree_output):
     if not tree_output:
         return {}
     
-    lines = tree_output.strip().split('\n')
+    # The parse itself is cached, callers get fresh dicts they are free to modify
+    network_items, device_rows = _parse_tree_snapshot(tree_output)
+    devices = [device._asdict() for device in device_rows]
+    
+    return {
+        'network_info': dict(network_items),
+        'devices': devices,
+        'total_devices': len(devices)
+    }
+
+@lru_cache(maxsize=32)
+def _parse_tree_snapshot(tree_output):
+    """
+    Parse tree_output once per distinct text, so exporting the same tree in several
+    formats doesn't re-scan it. Returns immutable
+    (((key, value), ...), (TreeDevice, ...)) tuples.
+    """
     network_info = {}
     devices = []
     
-    for line in lines:
-        line = line.strip()
+    # Iterate the text line by line instead of materialising a list of lines
+    for raw_line in StringIO(tree_output.strip()):
+        line = raw_line.strip()
         if not line:
             continue
             
-        # Parse network configuration
-        if line.startswith('network_name:'):
-            network_info['network_name'] = line.split(':', 1)[1].strip()
-        elif line.startswith('fan_version:'):
-            network_info['fan_version'] = line.split(':', 1)[1].strip()
-        elif line.startswith('domain:'):
-            network_info['domain'] = line.split(':', 1)[1].strip()
-        elif line.startswith('phy_mode_id:'):
-            network_info['phy_mode_id'] = line.split(':', 1)[1].strip()
-        elif line.startswith('chan_plan_id:'):
-            network_info['chan_plan_id'] = line.split(':', 1)[1].strip()
-        elif line.startswith('panid:'):
-            network_info['panid'] = line.split(':', 1)[1].strip()
-        elif line.startswith('size:'):
-            network_info['size'] = line.split(':', 1)[1].strip()
+        # Parse network configuration, one partition and set lookup per line
+        key, sep, value = line.partition(':')
+        if sep and key in _NET_KEYS:
+            network_info[key] = value.strip()
         # Parse device entries (IPv6 addresses)
         elif '::' in line:
-            # Extract IPv6 address
-            if line.startswith('├─') or line.startswith('└─'):
-                # This is a device in the tree
-                ipv6 = line.split()[-1] if line.split() else ''
-                if '::' in ipv6:
-                    devices.append({
-                        'ipv6': ipv6,
-                        'indent_level': len(line) - len(line.lstrip()) // 2,
-                        'line': line
-                    })
-            elif line.startswith('fd12:') or line.startswith('FD12:'):
+            match = _TREE_LINE_PATTERN.match(line)
+            if match is None:
+                continue
+            if match.group(1):
+                # This is a device in the tree. line[0] is its first non-blank character,
+                # so its position in raw_line is the leading whitespace width
+                indent_level = raw_line.find(line[0]) >> _INDENT_SHIFT
+                devices.append(TreeDevice(match.group(1), indent_level, line))
+            else:
                 # Direct IPv6 listing
-                devices.append({
-                    'ipv6': line,
-                    'indent_level': 0,
-                    'line': line
-                })
+                devices.append(TreeDevice(match.group(2), 0, line))
     
-    return {
-        'network_info': network_info,
-        'devices': devices,
-        'total_devices': len(devices)
-    }
+    return tuple(network_info.items()), tuple(devices)
+
+def _tree_snapshot(tree_output):
+    """The cached parse of tree_output, or empty tuples when there is no tree"""
+    if not tree_output:
+        return (), ()
+    return _parse_tree_snapshot(tree_output)
+
+# Fixed parts of the TXT report, filled in by one str.format call
+_TXT_RULE = "=" * 60
+_TXT_TEMPLATE = (
+    _TXT_RULE + "\n"
+    "           Wi-SUN Network Tree Status Report\n"
+    + _TXT_RULE + "\n"
+    "\n"
+    "Generated: {timestamp}\n"
+    "Total Wi-SUN Devices: {device_count}\n"
+    "\n"
+    "{network}"
+    "Connected Devices:\n"
+    + "-" * 18 + "\n"
+    "\n"
+    "{tree}\n"
+    "\n"
+    + _TXT_RULE + "\n"
+    "End of Report\n"
+    + _TXT_RULE
+)
+_TXT_NETWORK_HEADER = "Network Configuration:\n" + "-" * 25 + "\n"
 
 def generate_txt_report(tree_output, device_count, timestamp):
     """
     Generate TXT format report
+    Returns: UTF-8 encoded bytes
     """
-    parsed_data = parse_wisun_tree_data(tree_output)
-    
-    report = []
-    report.append("=" * 60)
-    report.append("           Wi-SUN Network Tree Status Report")
-    report.append("=" * 60)
-    report.append("")
-    report.append(f"Generated: {timestamp}")
-    report.append(f"Total Wi-SUN Devices: {device_count}")
-    report.append("")
-    
-    # Network Information
-    if parsed_data.get('network_info'):
-        report.append("Network Configuration:")
-        report.append("-" * 25)
-        for key, value in parsed_data['network_info'].items():
-            report.append(f"{key.replace('_', ' ').title()}: {value}")
-        report.append("")
-    
-    # Device List
-    report.append("Connected Devices:")
-    report.append("-" * 18)
-    report.append("")
-    
+    # Plain text only needs the network configuration, found in one regex scan
+    # over the whole tree; the tree itself is copied into the report verbatim
+    network_info = {}
     if tree_output:
-        # Use original tree output for better formatting
-        report.extend(tree_output.split('\n'))
-    else:
-        report.append("No device data available")
+        network_info = {m.group(1): m.group(2).strip() for m in _NET_LINE_PATTERN.finditer(tree_output)}
     
-    report.append("")
-    report.append("=" * 60)
-    report.append("End of Report")
-    report.append("=" * 60)
+    network = ''
+    if network_info:
+        network = _TXT_NETWORK_HEADER + ''.join(
+            f"{key.replace('_', ' ').title()}: {value}\n" for key, value in network_info.items()
+        ) + '\n'
     
-    return '\n'.join(report)
+    return _TXT_TEMPLATE.format(
+        timestamp=timestamp,
+        device_count=device_count,
+        network=network,
+        # Use original tree output for better formatting
+        tree=tree_output if tree_output else "No device data available"
+    ).encode('utf-8')
+
+if _HAS_REPORTLAB:
+    # Styles are the same for every report, build them once
+    _PDF_STYLES = getSampleStyleSheet()
+    _PDF_TITLE_STYLE = ParagraphStyle(
+        'CustomTitle',
+        parent=_PDF_STYLES['Heading1'],
+        fontSize=18,
+        spaceAfter=30,
+        alignment=TA_CENTER,
+        textColor=colors.darkblue
+    )
+    _PDF_HEADING_STYLE = ParagraphStyle(
+        'CustomHeading',
+        parent=_PDF_STYLES['Heading2'],
+        fontSize=14,
+        spaceAfter=12,
+        textColor=colors.darkgreen
+    )
+    _PDF_SUMMARY_TABLE_STYLE = TableStyle([
+        ('BACKGROUND', (0, 0), (-1, -1), colors.lightgrey),
+        ('TEXTCOLOR', (0, 0), (-1, -1), colors.black),
+        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+        ('FONTNAME', (0, 0), (-1, -1), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, -1), 11),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 12),
+        ('GRID', (0, 0), (-1, -1), 1, colors.black)
+    ])
+    _PDF_TREE_STYLE = ParagraphStyle(
+        'TreeText',
+        fontName='Courier',
+        fontSize=8,
+        leading=10,
+        leftIndent=6
+    )
 
 def generate_pdf_report(tree_output, device_count, timestamp):
     """
     Generate PDF format report using reportlab
     """
-    try:
-        from reportlab.lib.pagesizes import letter, A4
-        from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, KeepTogether
-        from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-        from reportlab.lib.units import inch
-        from reportlab.lib import colors
-        from reportlab.lib.enums import TA_CENTER, TA_LEFT
-        
-        buffer = BytesIO()
-        doc = SimpleDocTemplate(buffer, pagesize=A4, topMargin=1*inch)
-        
-        # Get styles
-        styles = getSampleStyleSheet()
-        title_style = ParagraphStyle(
-            'CustomTitle',
-            parent=styles['Heading1'],
-            fontSize=18,
-            spaceAfter=30,
-            alignment=TA_CENTER,
-            textColor=colors.darkblue
-        )
-        
-        heading_style = ParagraphStyle(
-            'CustomHeading',
-            parent=styles['Heading2'],
-            fontSize=14,
-            spaceAfter=12,
-            textColor=colors.darkgreen
-        )
-        
-        # Build content
-        story = []
-        
-        # Title
-        story.append(Paragraph("Wi-SUN Network Tree Status Report", title_style))
-        story.append(Spacer(1, 20))
-        
-        # Summary table
-        summary_data = [
-            ['Generated:', timestamp],
-            ['Total Wi-SUN Devices:', str(device_count)],
-        ]
-        
-        summary_table = Table(summary_data, colWidths=[2*inch, 3*inch])
-        summary_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, -1), colors.lightgrey),
-            ('TEXTCOLOR', (0, 0), (-1, -1), colors.black),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('FONTNAME', (0, 0), (-1, -1), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, -1), 11),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 12),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black)
-        ]))
-        
-        story.append(summary_table)
-        story.append(Spacer(1, 30))
-        
-        # Network Tree
-        story.append(Paragraph("Network Tree Structure", heading_style))
-        
-        if tree_output:
-            # Format tree output for PDF
-            tree_lines = tree_output.split('\n')
-            tree_data = [[line] for line in tree_lines if line.strip()]
-            
-            if tree_data:
-                tree_table = Table(tree_data, colWidths=[6*inch])
-                tree_table.setStyle(TableStyle([
-                    ('FONTNAME', (0, 0), (-1, -1), 'Courier'),
-                    ('FONTSIZE', (0, 0), (-1, -1), 8),
-                    ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-                    ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-                    ('LEFTPADDING', (0, 0), (-1, -1), 6),
-                    ('RIGHTPADDING', (0, 0), (-1, -1), 6),
-                    ('TOPPADDING', (0, 0), (-1, -1), 3),
-                    ('BOTTOMPADDING', (0, 0), (-1, -1), 3),
-                ]))
-                story.append(tree_table)
-        else:
-            story.append(Paragraph("No network tree data available", styles['Normal']))
-        
-        # Build PDF
-        doc.build(story)
-        buffer.seek(0)
-        return buffer.getvalue()
-        
-    except ImportError:
+    if not _HAS_REPORTLAB:
         raise ImportError("reportlab library is required for PDF generation")
+    
+    buffer = BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=A4, topMargin=1*inch)
+    
+    # Build content
+    story = []
+    
+    # Title
+    story.append(Paragraph("Wi-SUN Network Tree Status Report", _PDF_TITLE_STYLE))
+    story.append(Spacer(1, 20))
+    
+    # Summary table
+    summary_data = [
+        ['Generated:', timestamp],
+        ['Total Wi-SUN Devices:', str(device_count)],
+    ]
+    
+    summary_table = Table(summary_data, colWidths=[2*inch, 3*inch])
+    summary_table.setStyle(_PDF_SUMMARY_TABLE_STYLE)
+    
+    story.append(summary_table)
+    story.append(Spacer(1, 30))
+    
+    # Network Tree
+    story.append(Paragraph("Network Tree Structure", _PDF_HEADING_STYLE))
+    
+    if tree_output:
+        # One preformatted block for the whole tree instead of a table row per line
+        story.append(Preformatted(tree_output, _PDF_TREE_STYLE))
+    else:
+        story.append(Paragraph("No network tree data available", _PDF_STYLES['Normal']))
+    
+    # Build PDF
+    doc.build(story)
+    buffer.seek(0)
+    return buffer.getvalue()
 
 def generate_word_report(tree_output, device_count, timestamp):
     """
     Generate Word format report using python-docx
     """
-    try:
-        from docx import Document
-        from docx.shared import Inches
-        from docx.enum.text import WD_ALIGN_PARAGRAPH
-        from docx.shared import RGBColor
-        
-        doc = Document()
-        
-        # Title
-        title = doc.add_heading('Wi-SUN Network Tree Status Report', 0)
-        title.alignment = WD_ALIGN_PARAGRAPH.CENTER
-        
-        # Summary information
-        doc.add_heading('Report Summary', level=1)
-        
-        summary_table = doc.add_table(rows=2, cols=2)
-        summary_table.style = 'Table Grid'
-        
-        # Header row
-        hdr_cells = summary_table.rows[0].cells
-        hdr_cells[0].text = 'Generated'
-        hdr_cells[1].text = timestamp
-        
-        hdr_cells = summary_table.rows[1].cells
-        hdr_cells[0].text = 'Total Wi-SUN Devices'
-        hdr_cells[1].text = str(device_count)
-        
-        # Make header bold
-        for cell in summary_table.rows[0].cells:
-            for paragraph in cell.paragraphs:
-                for run in paragraph.runs:
-                    run.font.bold = True
-        
-        # Network Tree Section
-        doc.add_heading('Network Tree Structure', level=1)
-        
-        if tree_output:
-            # Add tree output as preformatted text
-            tree_paragraph = doc.add_paragraph()
-            tree_run = tree_paragraph.add_run(tree_output)
-            tree_run.font.name = 'Courier New'
-            tree_run.font.size = 10
-        else:
-            doc.add_paragraph('No network tree data available')
-        
-        # Save to BytesIO
-        buffer = BytesIO()
-        doc.save(buffer)
-        buffer.seek(0)
-        return buffer.getvalue()
-        
-    except ImportError:
+    if not _HAS_DOCX:
         raise ImportError("python-docx library is required for Word document generation")
+    
+    doc = Document()
+    
+    # Title
+    title = doc.add_heading('Wi-SUN Network Tree Status Report', 0)
+    title.alignment = WD_ALIGN_PARAGRAPH.CENTER
+    
+    # Summary information
+    doc.add_heading('Report Summary', level=1)
+    
+    summary_table = doc.add_table(rows=2, cols=2)
+    summary_table.style = 'Table Grid'
+    
+    # Header row
+    hdr_cells = summary_table.rows[0].cells
+    hdr_cells[0].text = 'Generated'
+    hdr_cells[1].text = timestamp
+    
+    hdr_cells = summary_table.rows[1].cells
+    hdr_cells[0].text = 'Total Wi-SUN Devices'
+    hdr_cells[1].text = str(device_count)
+    
+    # Make header bold
+    for cell in summary_table.rows[0].cells:
+        for paragraph in cell.paragraphs:
+            for run in paragraph.runs:
+                run.font.bold = True
+    
+    # Network Tree Section
+    doc.add_heading('Network Tree Structure', level=1)
+    
+    if tree_output:
+        # Add tree output as preformatted text
+        tree_paragraph = doc.add_paragraph()
+        tree_run = tree_paragraph.add_run(tree_output)
+        tree_run.font.name = 'Courier New'
+        tree_run.font.size = 10
+    else:
+        doc.add_paragraph('No network tree data available')
+    
+    # Save to BytesIO
+    buffer = BytesIO()
+    doc.save(buffer)
+    buffer.seek(0)
+    return buffer.getvalue()
 
-def generate_json_report(tree_output, device_count, timestamp):
+def generate_json_report(tree_output, device_count, timestamp, pretty=True):
     """
     Generate JSON format report
+    pretty=False skips indentation for machine consumers
+    Returns: UTF-8 encoded bytes
     """
     parsed_data = parse_wisun_tree_data(tree_output)
     
@@ -277,112 +324,137 @@ def generate_json_report(tree_output, device_count, timestamp):
         "raw_tree_output": tree_output
     }
     
-    return json.dumps(report, indent=2)
+    if orjson is not None:
+        return orjson.dumps(report, option=orjson.OPT_INDENT_2 if pretty else 0)
+    return json.dumps(report, indent=2 if pretty else None).encode('utf-8')
+
+def _csv_line(row):
+    """One CSV record, only rows that need quoting go through csv.writer"""
+    fields = ['' if field is None else str(field) for field in row]
+    # csv.writer writes a lone empty field as "" so the record isn't an empty line
+    if fields == [''] or any(_CSV_NEEDS_QUOTE.search(field) for field in fields):
+        out = StringIO()
+        # Keep the default \r\n terminator, it decides which fields get quoted
+        csv.writer(out).writerow(fields)
+        return out.getvalue()[:-2]
+    return ','.join(fields)
 
 def generate_csv_report(tree_output, device_count, timestamp):
     """
     Generate CSV format report
+    Returns: UTF-8 encoded bytes
     """
-    import csv
-    from io import StringIO
-    
-    parsed_data = parse_wisun_tree_data(tree_output)
+    # Read the cached snapshot directly, no per-device dicts are needed here
+    network_items, device_rows = _tree_snapshot(tree_output)
     
-    output = StringIO()
-    writer = csv.writer(output)
+    rows = []
     
     # Header
-    writer.writerow(['Wi-SUN Network Tree Status Report'])
-    writer.writerow(['Generated', timestamp])
-    writer.writerow(['Total Wi-SUN Devices', device_count])
-    writer.writerow([])
+    rows.append(['Wi-SUN Network Tree Status Report'])
+    rows.append(['Generated', timestamp])
+    rows.append(['Total Wi-SUN Devices', device_count])
+    rows.append([])
     
     # Network Configuration
-    if parsed_data.get('network_info'):
-        writer.writerow(['Network Configuration'])
-        for key, value in parsed_data['network_info'].items():
-            writer.writerow([key.replace('_', ' ').title(), value])
-        writer.writerow([])
+    if network_items:
+        rows.append(['Network Configuration'])
+        for key, value in network_items:
+            rows.append([key.replace('_', ' ').title(), value])
+        rows.append([])
     
     # Device List
-    writer.writerow(['Device Information'])
-    writer.writerow(['IPv6 Address', 'Indent Level', 'Raw Line'])
+    rows.append(['Device Information'])
+    rows.append(['IPv6 Address', 'Indent Level', 'Raw Line'])
     
-    for device in parsed_data.get('devices', []):
-        writer.writerow([device.get('ipv6', ''), device.get('indent_level', ''), device.get('line', '')])
+    rows.extend(device_rows)
     
-    return output.getvalue()
+    # csv.writer's default dialect ends every record, the last one included, with \r\n
+    return ('\r\n'.join(map(_csv_line, rows)) + '\r\n').encode('utf-8')
+
+def _xml_text(value):
+    """Escape a value for use as XML element text"""
+    return str(value).translate(_XML_ESCAPES)
+
+def _cdata(text):
+    """Wrap text in a CDATA section, splitting any ']]>' it contains"""
+    return '<![CDATA[' + str(text).replace(']]>', ']]]]><![CDATA[>') + ']]>'
 
 def generate_xml_report(tree_output, device_count, timestamp):
     """
     Generate XML format report
+    Returns: UTF-8 encoded bytes
     """
-    parsed_data = parse_wisun_tree_data(tree_output)
+    # Read the cached snapshot directly, no per-device dicts are needed here
+    network_items, device_rows = _tree_snapshot(tree_output)
+    
+    # Written straight into one buffer instead of a list of per-tag strings
+    buf = bytearray()
+    def w(text):
+        buf.extend(text.encode('utf-8'))
+        buf.extend(b'\n')
     
-    xml_lines = []
-    xml_lines.append('<?xml version="1.0" encoding="UTF-8"?>')
-    xml_lines.append('<wisun_network_report>')
-    xml_lines.append('  <report_info>')
-    xml_lines.append('    <title>Wi-SUN Network Tree Status Report</title>')
-    xml_lines.append(f'    <generated>{timestamp}</generated>')
-    xml_lines.append(f'    <total_wisun_devices>{device_count}</total_wisun_devices>')
-    xml_lines.append('  </report_info>')
+    w('<?xml version="1.0" encoding="UTF-8"?>')
+    w('<wisun_network_report>')
+    w('  <report_info>')
+    w('    <title>Wi-SUN Network Tree Status Report</title>')
+    w(f'    <generated>{_xml_text(timestamp)}</generated>')
+    w(f'    <total_wisun_devices>{_xml_text(device_count)}</total_wisun_devices>')
+    w('  </report_info>')
     
     # Network Configuration
-    if parsed_data.get('network_info'):
-        xml_lines.append('  <network_config>')
-        for key, value in parsed_data['network_info'].items():
-            xml_lines.append(f'    <{key}>{value}</{key}>')
-        xml_lines.append('  </network_config>')
+    if network_items:
+        w('  <network_config>')
+        for key, value in network_items:
+            w(f'    <{key}>{_xml_text(value)}</{key}>')
+        w('  </network_config>')
     
     # Devices
-    xml_lines.append('  <devices>')
-    for device in parsed_data.get('devices', []):
-        xml_lines.append('    <device>')
-        xml_lines.append(f'      <ipv6>{device.get("ipv6", "")}</ipv6>')
-        xml_lines.append(f'      <indent_level>{device.get("indent_level", "")}</indent_level>')
-        xml_lines.append(f'      <raw_line><![CDATA[{device.get("line", "")}]]></raw_line>')
-        xml_lines.append('    </device>')
-    xml_lines.append('  </devices>')
+    w('  <devices>')
+    for device in device_rows:
+        w('    <device>')
+        w(f'      <ipv6>{_xml_text(device.ipv6)}</ipv6>')
+        w(f'      <indent_level>{device.indent_level}</indent_level>')
+        w(f'      <raw_line>{_cdata(device.line)}</raw_line>')
+        w('    </device>')
+    w('  </devices>')
     
     # Raw tree output
-    xml_lines.append('  <raw_tree_output>')
-    xml_lines.append(f'    <![CDATA[{tree_output}]]>')
-    xml_lines.append('  </raw_tree_output>')
-    
-    xml_lines.append('</wisun_network_report>')
+    w('  <raw_tree_output>')
+    w(f'    {_cdata(tree_output)}')
+    w('  </raw_tree_output>')
     
+    buf.extend(b'</wisun_network_report>')
+    return bytes(buf)
+
+# format_type -> (file extension, MIME type), text formats are generated as UTF-8
+_FORMATS = {
+    'txt': ('.txt', 'text/plain; charset=utf-8'),
+    'pdf': ('.pdf', 'application/pdf'),
+    'word': ('.docx', 'application/vnd.openxmlformats-officedocument.wordprocessingml.document'),
+    'json': ('.json', 'application/json; charset=utf-8'),
+    'csv': ('.csv', 'text/csv; charset=utf-8'),
+    'xml': ('.xml', 'application/xml; charset=utf-8')
+}
+
 def get_file_extension(format_type):
     """Get file extension for format type"""
-    extensions = {
-        'txt': '.txt',
-        'pdf': '.pdf',
-        'word': '.docx',
-        'json': '.json',
-        'csv': '.csv',
-        'xml': '.xml'
-    }
-    return extensions.get(format_type, '.txt')
+    return _FORMATS.get(format_type, _FORMATS['txt'])[0]
 
 def get_mimetype(format_type):
     """Get MIME type for format type"""
-    mimetypes = {
-        'txt': 'text/plain',
-        'pdf': 'application/pdf',
-        'word': 'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
-        'json': 'application/json',
-        'csv': 'text/csv',
-        'xml': 'application/xml'
-    }
-    return mimetypes.get(format_type, 'text/plain')
+    return _FORMATS.get(format_type, _FORMATS['txt'])[1]
+
+# Filename timestamp format, and the table turning '2024-01-31 12:00:00' into '20240131_120000'
+_FILENAME_TS_FORMAT = '%Y%m%d_%H%M%S'
+_FILENAME_TS_TRANS = str.maketrans({':': None, '-': None, ' ': '_'})
 
 def generate_filename(format_type, timestamp=None):
     """Generate filename for download"""
     if not timestamp:
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        timestamp = datetime.now().strftime(_FILENAME_TS_FORMAT)
     else:
-        # Convert timestamp to filename-safe format
-        timestamp = timestamp.replace(':', '').replace('-', '').replace(' ', '_')
+        # Convert timestamp to filename-safe format in one pass
+        timestamp = timestamp.translate(_FILENAME_TS_TRANS)
     
     extension = get_file_extension(format_type)
     return f"wisun_tree_report_{timestamp}{extension}"
\ No newline at end of file
@@ -3,6 +3,8 @@ Test Result Writer Module
 Handles writing test results in different formats (TXT, PDF, Word)
 """
 
+import copy
+import logging
 import os
 from datetime import datetime
 from reportlab.lib.pagesizes import letter
@@ -12,22 +14,235 @@ from reportlab.lib.enums import TA_LEFT, TA_CENTER
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
 from reportlab.lib import colors
 from docx import Document
-from docx.shared import Inches as DocxInches
+from docx.shared import Emu, Inches as DocxInches
 from docx.enum.text import WD_ALIGN_PARAGRAPH
+from docx.oxml import OxmlElement
+from docx.oxml.ns import qn
+
+# Debug tracing, silent unless logging is configured for DEBUG
+log = logging.getLogger(__name__)
+
+# Started/Completed times shown in the reports
+DISPLAY_TIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+# PDF styles, built once and shared by every report
+_PDF_STYLES = getSampleStyleSheet()
+_PDF_TITLE_STYLE = ParagraphStyle(
+    'CustomTitle',
+    parent=_PDF_STYLES['Heading1'],
+    fontSize=18,
+    spaceAfter=30,
+    alignment=TA_CENTER
+)
+_PDF_TABLE_TITLE_STYLE = ParagraphStyle(
+    'TableTitle',
+    parent=_PDF_STYLES['Heading2'],
+    fontSize=16,
+    spaceAfter=20
+)
+_PDF_SUMMARY_STYLE = ParagraphStyle(
+    'Summary',
+    parent=_PDF_STYLES['Heading2'],
+    fontSize=14,
+    spaceAfter=12
+)
+_PDF_HEADER_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (0, -1), colors.grey),
+    ('TEXTCOLOR', (0, 0), (0, -1), colors.whitesmoke),
+    ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+    ('FONTNAME', (0, 0), (-1, -1), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, -1), 12),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 12),
+    ('BACKGROUND', (1, 0), (1, -1), colors.beige),
+    ('GRID', (0, 0), (-1, -1), 1, colors.black)
+])
+# Shared by every chunk of the results table
+_PDF_RESULTS_TABLE_STYLE = TableStyle([
+    # Header styling
+    ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, 0), 8),
+    ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+
+    # Data styling
+    ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+    ('FONTSIZE', (0, 1), (-1, -1), 7),
+    ('GRID', (0, 0), (-1, -1), 1, colors.black),
+    ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+
+    # Alternate row colors
+    ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.lightgrey])
+])
+
+# Results per PDF table, an even number keeps the alternating row colours continuous
+PDF_TABLE_CHUNK_ROWS = 200
+
+def _base_row(result, index):
+    """Sr No, IP, label and hop count, the columns every test type starts with"""
+    get = result.get
+    # append_result numbers every result, index only covers results added directly
+    return [
+        str(get('sr_no', index)),
+        get('ip', 'N/A'),
+        get('device_label', get('label', 'Unknown')),  # Check both field names
+        str(get('hop_count', 'N/A')),
+    ]
+
+def _ping_row(result, index):
+    get = result.get
+    loss = get('loss_percent')
+    if loss is None:
+        loss_percent = 'N/A'
+    elif loss == '-':
+        loss_percent = loss
+    else:
+        loss_percent = f"{loss}%"
+    row = _base_row(result, index)
+    row += [
+        str(get('packets_tx', 'N/A')),
+        str(get('packets_rx', 'N/A')),
+        loss_percent,
+        str(get('min_time', 'N/A')),
+        str(get('max_time', 'N/A')),
+        str(get('avg_time', 'N/A')),
+        str(get('mdev_time', 'N/A')),
+        get('connection_status', 'Unknown'),
+    ]
+    return row
+
+def _rsl_row(result, index):
+    get = result.get
+    row = _base_row(result, index)
+    row += [str(get('rsl_in', 'N/A')), str(get('rsl_out', 'N/A')), get('connection_status', 'Unknown')]
+    return row
+
+def _rpl_row(result, index):
+    get = result.get
+    row = _base_row(result, index)
+    row += [str(get('rpl_data', 'N/A')), get('connection_status', 'Unknown')]
+    return row
+
+def _disconnections_row(result, index):
+    get = result.get
+    row = _base_row(result, index)
+    # Use disconnected_total field from the test data
+    row += [str(get('disconnected_total', 'N/A')), get('connection_status', 'Unknown')]
+    return row
+
+def _availability_row(result, index):
+    ap = result.get('availability_percent', 'N/A')
+    is_number = isinstance(ap, (int, float))
+    if is_number:
+        availability_percent = f"{ap}%"
+    elif ap == "No response or CoAP error":
+        availability_percent = ap
+    else:
+        availability_percent = str(ap)
+    connection_status = 'AVAILABLE' if is_number and ap > 90 else 'UNAVAILABLE'
+    row = _base_row(result, index)
+    row += [availability_percent, connection_status]
+    return row
+
+def _default_row(result, index):
+    row = _base_row(result, index)
+    row.append(result.get('connection_status', 'Unknown'))
+    return row
+
+_BASE_HEADERS = ('Sr No.', 'IP Address', 'Device Label', 'Hop Count')
+
+# Table headers and row builder per test type, picked once per writer instead of
+# branching on every row
+_TABLE_SCHEMAS = {
+    'ping': (_BASE_HEADERS + ('Packets TX', 'Packets RX', 'Loss (%)', 'Min RTT (ms)', 'Max RTT (ms)',
+                              'Avg RTT (ms)', 'Mdev (ms)', 'Connection Status'), _ping_row),
+    'rssi': (_BASE_HEADERS + ('RSL In (dBm)', 'RSL Out (dBm)', 'Connection Status'), _rsl_row),
+    'rssl': (_BASE_HEADERS + ('RSL In (dBm)', 'RSL Out (dBm)', 'Connection Status'), _rsl_row),
+    'rpl': (_BASE_HEADERS + ('RPL Rank', 'Connection Status'), _rpl_row),
+    'disconnections': (_BASE_HEADERS + ('Disconnected Total', 'Connection Status'), _disconnections_row),
+    'availability': (_BASE_HEADERS + ('Availability Status', 'Connection Status'), _availability_row),
+}
+_DEFAULT_SCHEMA = (_BASE_HEADERS + ('Connection Status',), _default_row)
+
+def _text_widths(headers, rows):
+    """Longest text per column in characters, headers included"""
+    # Column by column, so max/map/len do the per-cell work in C
+    widths = [len(header) for header in headers]
+    for i, column in zip(range(len(widths)), zip(*rows)):
+        widths[i] = max(widths[i], max(map(len, map(str, column))))
+    return widths
+
+def _txt_table_lines(col_widths):
+    """Border line and the format string for one table line, for the given column widths"""
+    border_line = "+" + "+".join("-" * width for width in col_widths) + "+\n"
+    row_format = "|" + "".join(f" {{:<{width-1}}}|" for width in col_widths) + "\n"
+    return border_line, row_format
+
+def _word_cell_template(width, centered):
+    """An empty <w:tc> with the column width and alignment, cloned for each data cell"""
+    tc = OxmlElement('w:tc')
+    if width is not None:
+        tcPr = OxmlElement('w:tcPr')
+        tcW = OxmlElement('w:tcW')
+        tcW.set(qn('w:type'), 'dxa')
+        tcW.set(qn('w:w'), str(width.emu // 635))  # EMU to twentieths of a point
+        tcPr.append(tcW)
+        tc.append(tcPr)
+    p = OxmlElement('w:p')
+    if centered:
+        pPr = OxmlElement('w:pPr')
+        jc = OxmlElement('w:jc')
+        jc.set(qn('w:val'), 'center')
+        pPr.append(jc)
+        p.append(pPr)
+    tc.append(p)
+    return tc
+
+def _word_rows(columns, rows, header=False):
+    """
+    Build the <w:tr> elements for the given rows without going through table.add_row().
+    Header cells are bold and centered, data cells are centered after the basic info columns.
+    """
+    # Center-align numeric data columns, after Sr No, IP, Label and Hop Count
+    templates = [_word_cell_template(column.width, header or i > 3) for i, column in enumerate(columns)]
+    run_template = OxmlElement('w:r')
+    if header:
+        rPr = OxmlElement('w:rPr')
+        rPr.append(OxmlElement('w:b'))
+        run_template.append(rPr)
+    space = qn('xml:space')
+    trs = []
+    for row_data in rows:
+        tr = OxmlElement('w:tr')
+        for template, data in zip(templates, row_data):
+            tc = copy.deepcopy(template)
+            r = copy.deepcopy(run_template)
+            t = OxmlElement('w:t')
+            t.text = text = str(data)
+            if text != text.strip():
+                t.set(space, 'preserve')
+            r.append(t)
+            tc[-1].append(r)
+            tr.append(tc)
+        trs.append(tr)
+    return trs
 
 class TestResultWriter:
     def __init__(self, test_type, output_format, timestamp=None):
-        print(f"DEBUG: TestResultWriter.__init__ called with test_type='{test_type}', output_format='{output_format}'")
+        log.debug("TestResultWriter.__init__ called with test_type=%r, output_format=%r", test_type, output_format)
         self.test_type = test_type
+        # Table headers for this test type, shared read-only by every generator
+        self.headers, self._row_builder = _TABLE_SCHEMAS.get(test_type, _DEFAULT_SCHEMA)
         self.output_format = output_format.lower()
-        print(f"DEBUG: Normalized output_format to: '{self.output_format}'")
+        log.debug("Normalized output_format to: %r", self.output_format)
         self.timestamp = timestamp or datetime.now().strftime("%Y%m%d_%H%M%S")
         self.base_dir = "reports"
         
         # Create directories if they don't exist
         self.output_dir = os.path.join(self.base_dir, self.output_format)
         os.makedirs(self.output_dir, exist_ok=True)
-        print(f"DEBUG: Created output directory: {self.output_dir}")
+        log.debug("Created output directory: %s", self.output_dir)
         
         # Set up file paths
         self.filename = f"{test_type}_test_{self.timestamp}"
@@ -38,13 +253,19 @@ class TestResultWriter:
         elif self.output_format == 'word':
             self.file_path = os.path.join(self.output_dir, f"{self.filename}.docx")
         
-        print(f"DEBUG: File path set to: {self.file_path}")
+        log.debug("File path set to: %s", self.file_path)
         
-        # Store all results for table format
-        self.results = []
+        # Formatted table rows, one per appended device result
+        self.rows = []
+        self.result_count = 0
+        # Set by append_summary() and add_wisun_tree()
+        self.summary_text = None
+        self.wisun_tree_output = None
+        self.wisun_tree_timestamp = None
+        self.started = datetime.now().strftime(DISPLAY_TIME_FORMAT)
         
         # Initialize the file
-        print(f"DEBUG: Initializing file for output_format: {self.output_format}")
+        log.debug("Initializing file for output_format: %s", self.output_format)
         self._initialize_file()
     
     def _initialize_file(self):
@@ -57,49 +278,31 @@ class TestResultWriter:
             self._initialize_word()
     
     def _initialize_txt(self):
-        """Initialize TXT file"""
-        with open(self.file_path, 'w', encoding='utf-8') as f:
-            f.write(f"Wi-SUN Network Test Report\n")
-            f.write(f"{'=' * 50}\n")
-            f.write(f"Test Type: {self.test_type.upper()}\n")
-            f.write(f"Started: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-            f.write(f"{'=' * 50}\n\n")
+        """Initialize TXT header, written together with the table by finalize()"""
+        self._txt_header = (
+            f"Wi-SUN Network Test Report\n"
+            f"{'=' * 50}\n"
+            f"Test Type: {self.test_type.upper()}\n"
+            f"Started: {self.started}\n"
+            f"{'=' * 50}\n\n"
+        )
     
     def _initialize_pdf(self):
         """Initialize PDF file"""
         self.pdf_story = []
-        self.pdf_styles = getSampleStyleSheet()
-        
-        # Custom styles
-        title_style = ParagraphStyle(
-            'CustomTitle',
-            parent=self.pdf_styles['Heading1'],
-            fontSize=18,
-            spaceAfter=30,
-            alignment=TA_CENTER
-        )
         
         # Add title and header info
-        self.pdf_story.append(Paragraph("Wi-SUN Network Test Report", title_style))
+        self.pdf_story.append(Paragraph("Wi-SUN Network Test Report", _PDF_TITLE_STYLE))
         self.pdf_story.append(Spacer(1, 12))
         
         header_data = [
             ['Test Type:', self.test_type.upper()],
-            ['Started:', datetime.now().strftime('%Y-%m-%d %H:%M:%S')],
+            ['Started:', self.started],
             ['Format:', 'PDF Report']
         ]
         
         header_table = Table(header_data, colWidths=[2*inch, 4*inch])
-        header_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (0, -1), colors.grey),
-            ('TEXTCOLOR', (0, 0), (0, -1), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('FONTNAME', (0, 0), (-1, -1), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, -1), 12),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 12),
-            ('BACKGROUND', (1, 0), (1, -1), colors.beige),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black)
-        ]))
+        header_table.setStyle(_PDF_HEADER_TABLE_STYLE)
         
         self.pdf_story.append(header_table)
         self.pdf_story.append(Spacer(1, 20))
@@ -123,7 +326,7 @@ class TestResultWriter:
         
         cells = info_table.rows[1].cells
         cells[0].text = 'Started:'
-        cells[1].text = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        cells[1].text = self.started
         
         cells = info_table.rows[2].cells
         cells[0].text = 'Format:'
@@ -133,85 +336,28 @@ class TestResultWriter:
         self.doc.add_heading('Test Results', level=1)
     
     def append_result(self, device_result):
-        """Store device result for table format"""
-        print(f"DEBUG: append_result called with device_result: {device_result}")
+        """
+        Store device result for table format. Only its formatted row is kept, which
+        is far smaller than the result dict and leaves finalize() nothing to format.
+        """
+        log.debug("append_result called with device_result: %s", device_result)
         # Add serial number
-        device_result['sr_no'] = len(self.results) + 1
-        self.results.append(device_result)
-        print(f"DEBUG: Result appended. Total results now: {len(self.results)}")
+        self.result_count += 1
+        index = device_result['sr_no'] = self.result_count
+        self.rows.append(self._get_table_row(device_result, index))
+        log.debug("Result appended. Total results now: %s", self.result_count)
     
     def _get_table_headers(self):
-        """Get table headers based on test type"""
-        base_headers = ['Sr No.', 'IP Address', 'Device Label', 'Hop Count']
-        
-        if self.test_type == 'ping':
-            return base_headers + ['Packets TX', 'Packets RX', 'Loss (%)', 'Min RTT (ms)', 'Max RTT (ms)', 'Avg RTT (ms)', 'Mdev (ms)', 'Connection Status']
-        elif self.test_type == 'rssi' or self.test_type == 'rssl':
-            return base_headers + ['RSL In (dBm)', 'RSL Out (dBm)', 'Connection Status']
-        elif self.test_type == 'rpl':
-            return base_headers + ['RPL Rank', 'Connection Status']
-        elif self.test_type == 'disconnections':
-            return base_headers + ['Disconnected Total', 'Connection Status']
-        elif self.test_type == 'availability':
-            return base_headers + ['Availability Status', 'Connection Status']
-        else:
-            return base_headers + ['Connection Status']
+        """Get table headers based on test type, resolved once in __init__"""
+        return self.headers
     
-    def _get_table_row(self, result):
-        """Generate a table row for the given result"""
-        # Find the position of this result in the results list
-        sr_no = str(self.results.index(result) + 1)
-        ip = result.get('ip', 'N/A')
-        device_label = result.get('device_label', result.get('label', 'Unknown'))  # Check both field names
-        hop_count = str(result.get('hop_count', 'N/A'))
-        
-        # Base row with common fields
-        row = [sr_no, ip, device_label, hop_count]
-        
-        if self.test_type == 'ping':
-            packets_tx = str(result.get('packets_tx', 'N/A'))
-            packets_rx = str(result.get('packets_rx', 'N/A'))
-            loss_percent = f"{result.get('loss_percent', 'N/A')}%" if result.get('loss_percent') is not None and result.get('loss_percent') != '-' else (result.get('loss_percent', 'N/A') if result.get('loss_percent') == '-' else 'N/A')
-            min_rtt = str(result.get('min_time', 'N/A'))  # Changed from min_rtt to min_time
-            max_rtt = str(result.get('max_time', 'N/A'))  # Changed from max_rtt to max_time
-            avg_rtt = str(result.get('avg_time', 'N/A'))  # Changed from avg_rtt to avg_time
-            mdev = str(result.get('mdev_time', 'N/A'))    # Changed from mdev to mdev_time
-            connection_status = result.get('connection_status', 'Unknown')
-            
-            row.extend([packets_tx, packets_rx, loss_percent, min_rtt, max_rtt, avg_rtt, mdev, connection_status])
-            
-        elif self.test_type == 'rssi' or self.test_type == 'rssl':
-            rsl_in = str(result.get('rsl_in', 'N/A'))
-            rsl_out = str(result.get('rsl_out', 'N/A'))
-            connection_status = result.get('connection_status', 'Unknown')
-            
-            row.extend([rsl_in, rsl_out, connection_status])
-            
-        elif self.test_type == 'rpl':
-            rpl_rank = str(result.get('rpl_data', 'N/A'))
-            connection_status = result.get('connection_status', 'Unknown')
-            
-            row.extend([rpl_rank, connection_status])
-            
-        elif self.test_type == 'disconnections':
-            # Use disconnected_total field from the test data
-            disconnected_total = str(result.get('disconnected_total', 'N/A'))
-            connection_status = result.get('connection_status', 'Unknown')
-            
-            row.extend([disconnected_total, connection_status])
-            
-        elif self.test_type == 'availability':
-            ap = result.get('availability_percent', 'N/A')
-            if isinstance(ap, (int, float)):
-                availability_percent = f"{ap}%"
-            elif ap == "No response or CoAP error":
-                availability_percent = ap
-            else:
-                availability_percent = str(ap)
-            connection_status = 'AVAILABLE' if isinstance(ap, (int, float)) and ap > 90 else 'UNAVAILABLE'
-            row.extend([availability_percent, connection_status])
-        
-        return row
+    def _get_table_row(self, result, index=0):
+        """Generate a table row for the given result, index is its 1-based position"""
+        return self._row_builder(result, index)
+    
+    def _get_table_rows(self):
+        """The formatted rows, shared by the width pass and the output pass"""
+        return self.rows
     
     def append_summary(self, summary_text):
         """Store summary text for finalization"""
@@ -219,157 +365,113 @@ class TestResultWriter:
     
     def write_summary(self, summary_text):
         """Store summary text for finalization (alias for append_summary)"""
-        print(f"DEBUG: write_summary called with: {summary_text}")
+        log.debug("write_summary called with: %s", summary_text)
         self.append_summary(summary_text)
     
     def add_wisun_tree(self, tree_output, timestamp):
         """Add Wi-SUN tree output to the report"""
-        print(f"DEBUG: add_wisun_tree called with tree output length: {len(tree_output)}")
+        log.debug("add_wisun_tree called with tree output length: %s", len(tree_output))
         self.wisun_tree_output = tree_output
         self.wisun_tree_timestamp = timestamp
     
     def finalize(self):
-        """Finalize and save the file with table format"""
-        print(f"DEBUG: TestResultWriter.finalize() called for output_format: {self.output_format}")
-        print(f"DEBUG: Number of results to write: {len(self.results)}")
+        """Finalize and save the file with table format, the writer can't be reused afterwards"""
+        log.debug("TestResultWriter.finalize() called for output_format: %s", self.output_format)
+        log.debug("Number of results to write: %s", self.result_count)
         
+        rows = self._get_table_rows()
+        completed = datetime.now().strftime(DISPLAY_TIME_FORMAT)
         if self.output_format == 'txt':
-            self._generate_txt_table()
+            self._generate_txt_table(rows, completed)
         elif self.output_format == 'pdf':
-            self._generate_pdf_table()
+            self._generate_pdf_table(rows, completed)
         elif self.output_format == 'word':
-            print(f"DEBUG: Calling _generate_word_table()")
-            self._generate_word_table()
-        
-        print(f"DEBUG: Finalization complete. File path: {self.file_path}")
-        print(f"DEBUG: File exists after finalization: {os.path.exists(self.file_path)}")
-        if os.path.exists(self.file_path):
-            file_size = os.path.getsize(self.file_path)
-            print(f"DEBUG: File size: {file_size} bytes")
+            log.debug("Calling _generate_word_table()")
+            self._generate_word_table(rows, completed)
+        
+        # The report is on disk, don't hold the rows and the document in memory
+        # for as long as the caller keeps the writer around
+        self.rows = []
+        self.pdf_story = self.doc = self._txt_header = self.wisun_tree_output = None
+        
+        log.debug("Finalization complete. File path: %s", self.file_path)
+        if log.isEnabledFor(logging.DEBUG):
+            # Only stat the file when the result is actually logged, and only once
+            try:
+                log.debug("File size: %s bytes", os.stat(self.file_path).st_size)
+            except OSError:
+                log.debug("File does not exist after finalization: %s", self.file_path)
         
         return self.file_path
     
-    def _generate_txt_table(self):
-        """Generate TXT file with table format"""
-        headers = self._get_table_headers()
-        
-        with open(self.file_path, 'a', encoding='utf-8') as f:
-            f.write("Test Results\n")
-            f.write("=" * 120 + "\n")
-            
-            # Calculate column widths
-            col_widths = []
-            for i, header in enumerate(headers):
-                max_width = len(header)
-                for result in self.results:
-                    row_data = self._get_table_row(result)
-                    if i < len(row_data):
-                        max_width = max(max_width, len(str(row_data[i])))
-                col_widths.append(max_width + 2)  # Add padding
-            
-            # Create table border
-            border_line = "+" + "+".join("-" * width for width in col_widths) + "+"
-            f.write(border_line + "\n")
-            
-            # Write header row
-            header_row = "|"
-            for i, header in enumerate(headers):
-                header_row += f" {header:<{col_widths[i]-1}}|"
-            f.write(header_row + "\n")
-            f.write(border_line + "\n")
-            
-            # Write data rows
-            for result in self.results:
-                row_data = self._get_table_row(result)
-                data_row = "|"
-                for i, data in enumerate(row_data):
-                    if i < len(col_widths):
-                        data_row += f" {str(data):<{col_widths[i]-1}}|"
-                f.write(data_row + "\n")
-            
-            f.write(border_line + "\n")
-            
-            # Add summary
-            if hasattr(self, 'summary_text'):
-                f.write(f"\nTEST SUMMARY\n")
-                f.write(f"{'=' * 80}\n")
-                f.write(f"{self.summary_text}\n")
-                f.write(f"Completed: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-
-    def _generate_pdf_table(self):
-        """Generate PDF file with table format"""
-        headers = self._get_table_headers()
+    def _generate_txt_table(self, rows, completed):
+        """Generate TXT file with table format from the formatted rows"""
+        # Calculate column widths
+        col_widths = [width + 2 for width in _text_widths(self.headers, rows)]  # Add padding
+        border_line, row_format = _txt_table_lines(col_widths)
         
-        # Add table title
-        self.pdf_story.append(Paragraph("Test Results", 
-                                      ParagraphStyle('TableTitle', 
-                                                   parent=self.pdf_styles['Heading2'],
-                                                   fontSize=16, spaceAfter=20)))
+        # Build the whole section first and write it with a single call
+        parts = [self._txt_header, "Test Results\n", "=" * 120 + "\n", border_line,
+                 row_format.format(*self.headers), border_line]
+        parts.extend(row_format.format(*map(str, row_data)) for row_data in rows)
+        parts.append(border_line)
         
-        # Prepare table data
-        table_data = [headers]  # Header row
-        for result in self.results:
-            table_data.append(self._get_table_row(result))
+        # Add summary
+        if self.summary_text is not None:
+            parts.append(f"\nTEST SUMMARY\n{'=' * 80}\n{self.summary_text}\n")
+            parts.append(f"Completed: {completed}\n")
         
-        # Calculate column widths
-        num_cols = len(headers)
-        col_width = 7.5 * inch / num_cols  # Distribute evenly across page width
-        col_widths = [col_width] * num_cols
-        
-        # Create table
-        table = Table(table_data, colWidths=col_widths, repeatRows=1)
-        table.setStyle(TableStyle([
-            # Header styling
-            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 8),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            
-            # Data styling
-            ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-            ('FONTSIZE', (0, 1), (-1, -1), 7),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black),
-            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-            
-            # Alternate row colors
-            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.lightgrey])
-        ]))
+        # Header and table in one open and one write
+        with open(self.file_path, 'w', encoding='utf-8', buffering=1 << 20) as f:
+            f.write("".join(parts))
+
+    def _generate_pdf_table(self, rows, completed):
+        """Generate PDF file with table format from the formatted rows"""
+        headers = self.headers
         
-        self.pdf_story.append(table)
+        # Add table title
+        self.pdf_story.append(Paragraph("Test Results", _PDF_TABLE_TITLE_STYLE))
+        
+        # Share the page width between the columns in proportion to their longest text,
+        # so wide columns such as the IP address don't wrap while short ones stay narrow
+        text_widths = _text_widths(headers, rows)
+        total = sum(text_widths)
+        col_widths = [7.5 * inch * width / total for width in text_widths]
+        
+        # ReportLab re-lays out the remaining rows of a table at every page break, so
+        # long result lists are split into several tables of PDF_TABLE_CHUNK_ROWS rows.
+        # Each chunk repeats the header; a header only table is kept when there are no rows.
+        for start in range(0, max(len(rows), 1), PDF_TABLE_CHUNK_ROWS):
+            table = Table([headers] + rows[start:start + PDF_TABLE_CHUNK_ROWS],
+                          colWidths=col_widths, repeatRows=1, splitByRow=1)
+            table.setStyle(_PDF_RESULTS_TABLE_STYLE)
+            self.pdf_story.append(table)
         
         # Add summary
-        if hasattr(self, 'summary_text'):
+        if self.summary_text is not None:
             self.pdf_story.append(Spacer(1, 20))
-            summary_style = ParagraphStyle(
-                'Summary',
-                parent=self.pdf_styles['Heading2'],
-                fontSize=14,
-                spaceAfter=12
-            )
-            self.pdf_story.append(Paragraph("Test Summary", summary_style))
-            self.pdf_story.append(Paragraph(self.summary_text, self.pdf_styles['Normal']))
-            self.pdf_story.append(Paragraph(f"Completed: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}", 
-                                          self.pdf_styles['Normal']))
+            self.pdf_story.append(Paragraph("Test Summary", _PDF_SUMMARY_STYLE))
+            self.pdf_story.append(Paragraph(self.summary_text, _PDF_STYLES['Normal']))
+            self.pdf_story.append(Paragraph(f"Completed: {completed}", 
+                                          _PDF_STYLES['Normal']))
         
         # Build PDF
         doc = SimpleDocTemplate(self.file_path, pagesize=letter)
         doc.build(self.pdf_story)
     
-    def _generate_word_table(self):
-        """Generate Word document with table format"""
-        print(f"DEBUG: _generate_word_table() called")
-        headers = self._get_table_headers()
-        print(f"DEBUG: Table headers: {headers}")
+    def _generate_word_table(self, rows, completed):
+        """Generate Word document with table format from the formatted rows"""
+        log.debug("_generate_word_table() called")
+        headers = self.headers
+        log.debug("Table headers: %s", headers)
         
         # Add table title
         self.doc.add_heading('Test Results', level=1)
         
-        # Create table
-        table = self.doc.add_table(rows=1, cols=len(headers))
+        # Create table, all rows including the header are added below as raw XML
+        table = self.doc.add_table(rows=0, cols=len(headers))
         table.style = 'Table Grid'
-        print(f"DEBUG: Created table with {len(headers)} columns")
+        log.debug("Created table with %s columns", len(headers))
         
         # Set column widths based on content
         if self.test_type == 'ping':
@@ -382,44 +484,37 @@ class TestResultWriter:
             col_widths = [DocxInches(0.5), DocxInches(2.5), DocxInches(1.5), DocxInches(1.0), 
                          DocxInches(1.5), DocxInches(1.5)]
         
-        # Apply column widths
-        for i, width in enumerate(col_widths[:len(headers)]):
-            for cell in table.columns[i].cells:
-                cell.width = width
-        
-        # Set header row
-        header_cells = table.rows[0].cells
-        for i, header in enumerate(headers):
-            header_cells[i].text = header
-            # Make header bold and center-aligned
-            for paragraph in header_cells[i].paragraphs:
-                paragraph.alignment = WD_ALIGN_PARAGRAPH.CENTER
-                for run in paragraph.runs:
-                    run.bold = True
-        
-        # Add data rows
-        for result in self.results:
-            row_data = self._get_table_row(result)
-            row_cells = table.add_row().cells
-            for i, data in enumerate(row_data):
-                row_cells[i].text = str(data)
-                # Center-align numeric data columns
-                if i > 3:  # After basic info columns (Sr No, IP, Label, Hop Count)
-                    for paragraph in row_cells[i].paragraphs:
-                        paragraph.alignment = WD_ALIGN_PARAGRAPH.CENTER
+        # The layout is fixed below, so shrink the widths to the page's usable width
+        # rather than letting the table run past the right margin
+        section = self.doc.sections[-1]
+        usable_width = section.page_width - section.left_margin - section.right_margin
+        total_width = sum(col_widths)
+        if total_width > usable_width:
+            col_widths = [Emu(width * usable_width // total_width) for width in col_widths]
+        
+        # Apply column widths on the table grid, once per column rather than per cell
+        table.autofit = False
+        for column, width in zip(table.columns, col_widths):
+            column.width = width
+        
+        # Set header row, bold and center-aligned
+        table._tbl.extend(_word_rows(table.columns, [headers], header=True))
+        
+        # Add data rows in one go, table.add_row() re-reads the table grid on every call
+        table._tbl.extend(_word_rows(table.columns, rows))
         
         # Set table alignment
         table.alignment = WD_ALIGN_PARAGRAPH.CENTER
         
         # Add summary if available
-        if hasattr(self, 'summary_text'):
+        if self.summary_text is not None:
             self.doc.add_paragraph('')  # Add spacing
             self.doc.add_heading('Test Summary', level=2)
             self.doc.add_paragraph(self.summary_text)
-            self.doc.add_paragraph(f"Completed: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+            self.doc.add_paragraph(f"Completed: {completed}")
         
         # Add Wi-SUN tree at the end if available
-        if hasattr(self, 'wisun_tree_output'):
+        if self.wisun_tree_output is not None:
             self.doc.add_page_break()
             self.doc.add_heading('Wi-SUN Network Tree', level=1)
             self.doc.add_paragraph(f"Generated: {self.wisun_tree_timestamp}")
@@ -428,21 +523,22 @@ class TestResultWriter:
             # Add tree output with monospace font
             tree_paragraph = self.doc.add_paragraph()
             tree_run = tree_paragraph.add_run(self.wisun_tree_output)
-            tree_run.font.name = 'Courier New'
-            tree_run.font.size = DocxInches(0.1)  # Readable font size
+            # Courier New at 9 pt, written as one <w:rPr> instead of per-property updates
+            rPr = OxmlElement('w:rPr')
+            rFonts = OxmlElement('w:rFonts')
+            rFonts.set(qn('w:ascii'), 'Courier New')
+            rFonts.set(qn('w:hAnsi'), 'Courier New')
+            rPr.append(rFonts)
+            sz = OxmlElement('w:sz')
+            sz.set(qn('w:val'), '18')  # Half-points
+            rPr.append(sz)
+            tree_run._r.insert(0, rPr)
         
         # Save document
-        print(f"DEBUG: Saving Word document to: {self.file_path}")
+        log.debug("Saving Word document to: %s", self.file_path)
         self.doc.save(self.file_path)
-        print(f"DEBUG: Word document saved successfully")
-        
-        # Verify file was created
-        if os.path.exists(self.file_path):
-            file_size = os.path.getsize(self.file_path)
-            print(f"DEBUG: Verified file exists with size: {file_size} bytes")
-        else:
-            print(f"ERROR: Word file was not created at: {self.file_path}")
+        log.debug("Word document saved successfully")
     
     def get_file_path(self):
         """Get the current file path"""
-        return self.file_path
\ No newline at end of file
+        return self.file_path